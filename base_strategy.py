@@ -6,7 +6,7 @@
 import pandas as pd
 from math import fabs
 from pandas import DataFrame
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from freqtrade.strategy import (BooleanParameter, CategoricalParameter, DecimalParameter,
@@ -15,10 +15,31 @@ from freqtrade.strategy import (BooleanParameter, CategoricalParameter, DecimalP
 # --------------------------------
 # Add your lib to import here
 import logging
+from pathlib import Path
 from freqtrade.constants import Config
+from freqtrade.enums import RunMode
 from freqtrade.exchange import timeframe_to_minutes
 from freqtrade.persistence import Order, PairLocks, Trade
 
+from indicators.cache import IndicatorCache
+from utils.latency import LatencyRecorder
+from utils.dataframe_cache import AppendOnlyFrame, DataFrameCache, HISTORY_REWRITTEN, candle_delta, candle_marker
+from utils.log_queue import enable_queue_logging
+from utils.notification import NotificationThrottle
+from utils.pair_config import PairConfig, PairConfigResolver
+from utils.pair_state import PairState, PairStateRegistry
+from utils.state_journal import StateJournal
+from utils.persistent_cache import PersistentDataFrameCache
+from utils.ticker_snapshot import TickerSnapshot
+
+# Map of the levels accepted by `log()` to the levels of the logging module
+LOG_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR
+}
+
 class BaseStrategy(IStrategy):
     """
     This is a strategy template to get you started.
@@ -87,15 +108,82 @@ class BaseStrategy(IStrategy):
     # Leverage configuration
     leverage_configuration = {}
 
+    # Configuration per pair and side, resolved for the whitelist (and on first use for other pairs)
+    pair_configs = None
+
     # Create custom dictionary for storing run-time data
     custom_info = {}
 
+    # Run-time state per pair and side (trade direction)
+    pair_states = None
+
+    # Journal the run-time state per pair and side on disk (in the user data dir), to resume
+    # trailing and open Safety Orders after a restart. Written and synced to disk once per bot loop,
+    # at most once per interval (seconds)
+    state_journal = False
+    state_journal_sync_interval = 1.0
+
+    # Journal of the run-time state
+    pair_state_journal = None
+
+    # Shared cache for true range, ATR, SMA and HL2 used by indicators
+    indicator_cache = None
+
+    # Memory budget (in MB) for the indicator cache
+    indicator_cache_max_mb = 16
+
+    # Memory budget (in MB) for the cache with dataframes
+    dataframe_cache_max_mb = 256
+
+    # Storage of cached dataframes; 'copy' stores a full copy on every update, 'append' only adds
+    # the new candles to a growing buffer and hands out read-only views
+    dataframe_cache_mode = 'copy'
+
+    # Store cached dataframes on disk (in the user data dir) to reuse them after a restart
+    persistent_cache = False
+
+    # Write log records from a background thread, so logging never blocks the bot loop
+    async_logging = True
+
+    # Coalescing and rate limiting of notifications. Debounce windows apply per pair and category,
+    # digest mode (interval > 0) merges all messages of an interval into one message
+    notification_configuration = {
+        'debounce_seconds': 0,
+        'category_debounce_seconds': {
+            'trailing': 60
+        },
+        'digest_interval_seconds': 0,
+        'max_per_minute': 20
+    }
+
+    # Decides which notifications are send
+    notification_throttle = None
+
+    # Measure the duration of the callbacks below per pair (opt-in), and optionally write the
+    # statistics as Prometheus text file
+    latency_instrumentation = False
+    latency_prometheus_file = None
+    latency_callbacks = ('populate_indicators', 'populate_entry_trend', 'adjust_trade_position',
+                         'custom_stoploss', 'confirm_trade_entry', 'order_filled')
+
+    # Durations of the instrumented callbacks
+    latency_recorder = None
+
+    # Time to live (in seconds) of the fetched tickers, shared by all callers within the period
+    ticker_snapshot_ttl = 5.0
+
+    # Tickers of the open trades, fetched once for all callers
+    ticker_snapshot = None
+
     # Config related
     config_max_trades = 0
 
     # Optimize trades (allow new trade when stoploss is activated)
     enable_improved_trade_count = False
 
+    # Interval (in minutes) of the full rescan checking the tracked trades in stoploss
+    stoploss_rescan_minutes = 30
+
     # Set option for logging dataframe and make sure all columns are visible
     pd.set_option('display.max_columns', None)
 
@@ -120,11 +208,81 @@ class BaseStrategy(IStrategy):
         # Initialize logger
         self.logger = logging.getLogger('freqtrade.strategy')
 
+        # Initialize run-time state per pair and side
+        self.pair_states = PairStateRegistry(self.create_pair_state)
+
+        # Initialize configuration per pair and side
+        self.pair_configs = PairConfigResolver(self.create_pair_config)
+
         # Read config
         if 'max_open_trades' in config:
             if isinstance(config['max_open_trades'], int):
                 self.config_max_trades = config['max_open_trades']
 
+        if 'dataframe_cache_max_mb' in config:
+            if isinstance(config['dataframe_cache_max_mb'], (int, float)):
+                self.dataframe_cache_max_mb = config['dataframe_cache_max_mb']
+
+        if 'indicator_cache_max_mb' in config:
+            if isinstance(config['indicator_cache_max_mb'], (int, float)):
+                self.indicator_cache_max_mb = config['indicator_cache_max_mb']
+
+        # Initialize indicator cache
+        self.indicator_cache = IndicatorCache(int(self.indicator_cache_max_mb * 1024 * 1024))
+
+        if 'dataframe_cache_mode' in config:
+            if config['dataframe_cache_mode'] in ('copy', 'append'):
+                self.dataframe_cache_mode = config['dataframe_cache_mode']
+
+        if 'persistent_cache' in config:
+            if isinstance(config['persistent_cache'], bool):
+                self.persistent_cache = config['persistent_cache']
+
+        if 'state_journal' in config:
+            if isinstance(config['state_journal'], bool):
+                self.state_journal = config['state_journal']
+
+        if 'state_journal_sync_interval' in config:
+            if isinstance(config['state_journal_sync_interval'], (int, float)):
+                self.state_journal_sync_interval = config['state_journal_sync_interval']
+
+        if 'async_logging' in config:
+            if isinstance(config['async_logging'], bool):
+                self.async_logging = config['async_logging']
+
+        if self.async_logging:
+            enable_queue_logging(self.logger)
+
+        if 'notification_configuration' in config:
+            if isinstance(config['notification_configuration'], dict):
+                self.notification_configuration = {**self.notification_configuration, **config['notification_configuration']}
+
+        if 'latency_instrumentation' in config:
+            if isinstance(config['latency_instrumentation'], bool):
+                self.latency_instrumentation = config['latency_instrumentation']
+
+        if 'latency_prometheus_file' in config:
+            if isinstance(config['latency_prometheus_file'], str):
+                self.latency_prometheus_file = config['latency_prometheus_file']
+
+        if self.latency_instrumentation:
+            self.instrument_callbacks()
+
+        if 'ticker_snapshot_ttl' in config:
+            if isinstance(config['ticker_snapshot_ttl'], (int, float)):
+                self.ticker_snapshot_ttl = config['ticker_snapshot_ttl']
+
+        self.ticker_snapshot = TickerSnapshot(
+            self.fetch_tickers, self.ticker_snapshot_ttl, on_error=self.log_ticker_error
+        )
+
+        self.notification_throttle = NotificationThrottle(
+            debounce_seconds=self.notification_configuration.get('debounce_seconds', 0),
+            category_debounce_seconds=self.notification_configuration.get('category_debounce_seconds'),
+            digest_interval_seconds=self.notification_configuration.get('digest_interval_seconds', 0),
+            max_per_minute=self.notification_configuration.get('max_per_minute', 0)
+        )
+
         # Make sure the contents of the Leverage configuration is correct
         for k, v in self.leverage_configuration.items():
             self.leverage_configuration[k] = float(v)
@@ -145,19 +303,59 @@ class BaseStrategy(IStrategy):
         :param **kwargs: Ensure to keep this here so updates to this won't break your strategy.
         """
     
+        # Files in the user data dir belong to the running bot; backtesting and hyperopt (sharing
+        # the config) must not read, replace or remove them
+        live = self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN)
+
         # Setup cache for dataframes
-        self.custom_info['cache'] = {}
+        self.custom_info['cache'] = DataFrameCache(int(self.dataframe_cache_max_mb * 1024 * 1024))
+
+        # Setup persistent storage of the cache. Files are only read when a dataframe is requested
+        self.custom_info['persistent-cache'] = None
+        if self.persistent_cache and live and 'user_data_dir' in self.config:
+            self.custom_info['persistent-cache'] = PersistentDataFrameCache(
+                Path(self.config['user_data_dir']) / 'indicator_cache',
+                self.__class__.__name__,
+                self.get_indicator_parameters()
+            )
 
         # Setup removal of autolocks
         self.custom_info['remove-autolock'] = []
 
+        # Setup tracking of trades in stoploss (ids), updated by the callbacks and rescanned periodically
+        self.custom_info['stoploss-trades'] = set()
+        self.custom_info['stoploss-rescan'] = datetime.min
+
+        # Setup journal of the run-time state, and read the states stored before the restart. The
+        # strategy restores them when initializing the state of the open trades
+        self.custom_info['journal-states'] = {}
+        if self.state_journal and live and 'user_data_dir' in self.config:
+            self.pair_state_journal = StateJournal(
+                Path(self.config['user_data_dir']) / 'state_journal' / f"{self.__class__.__name__}-{self.dp.runmode.value}.jsonl",
+                sync_interval=self.state_journal_sync_interval
+            )
+            self.custom_info['journal-states'] = self.pair_state_journal.replay()
+
         # Call to super first
         super().bot_start()
         self.log(f"Version - Base Strategy: '{BaseStrategy.version(self)}'")
         self.log(f"Running with leverage configuration: '{self.leverage_configuration}'")
 
-        # Determine max number of trades
-        self.update_max_trade_count()
+        if self.custom_info['persistent-cache'] is not None:
+            removed = self.custom_info['persistent-cache'].remove_outdated()
+            self.log(
+                f"Using persistent cache in '{self.custom_info['persistent-cache'].directory}'. "
+                f"Removed {len(removed)} file(s) written with other indicator parameters."
+            )
+
+        if self.pair_state_journal is not None:
+            self.log(
+                f"Using state journal '{self.pair_state_journal.path}'. "
+                f"Read {len(self.custom_info['journal-states'])} stored state(s)."
+            )
+
+        # Determine trades in stoploss and max number of trades
+        self.rescan_trade_stoploss_ids()
 
 
     def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
@@ -173,9 +371,40 @@ class BaseStrategy(IStrategy):
         if current_time.minute % 5 == 0 and current_time.second <= 8:
             # Clean cache
             self.cleanup_cache()
+            self.log("Dataframe cache statistics: %s", "DEBUG", args=(self.custom_info['cache'].stats(),))
+            self.flush_persistent_cache()
+            self.log("Indicator cache statistics: %s", "DEBUG", args=(self.indicator_cache.stats(),))
+
+            self.notification_throttle.cleanup()
+            self.log("Notification statistics: %s", "DEBUG", args=(self.notification_throttle.stats(),))
+
+            self.report_latency()
 
-            # Determine max number of active trades
-            self.update_max_trade_count()
+            self.log("Ticker snapshot statistics: %s", "DEBUG", args=(self.ticker_snapshot.stats(),))
+
+            if self.pair_state_journal is not None:
+                if self.pair_state_journal.needs_compaction():
+                    self.compact_state_journal()
+                self.log("State journal statistics: %s", "DEBUG", args=(self.pair_state_journal.stats(),))
+
+            # Check the tracked trades in stoploss now and then
+            if (current_time.replace(tzinfo=None) - self.custom_info['stoploss-rescan']) >= timedelta(minutes=self.stoploss_rescan_minutes):
+                self.rescan_trade_stoploss_ids(current_time)
+
+        # Send notifications collected in digest mode
+        self.flush_notifications()
+
+        # Resolve the configuration of the pairs again when the whitelist has changed
+        if self.dp is not None and self.pair_configs.refresh(self.dp.current_whitelist()):
+            self.log(
+                "Resolved configuration for %d pair(s) and side(s) of the whitelist.",
+                "DEBUG",
+                args=(len(self.pair_configs),)
+            )
+
+        # Write and sync the state transitions of the last loop(s) to disk
+        if self.pair_state_journal is not None:
+            self.pair_state_journal.sync()
 
         # Check if there are pairs set for which the Auto lock should be reoved
         if len(self.custom_info['remove-autolock']) > 0:
@@ -304,15 +533,14 @@ class BaseStrategy(IStrategy):
         # the trade will only be closed when the total amount has been sold
         # TODO: monitor what will happen with partially filled 'sell' orders
         if order.ft_order_side == trade.exit_side and not trade.is_open:
-            custompairkey = self.get_custom_pairkey(trade.pair, trade.trade_direction)
+            if self.pair_states.remove(trade.pair, trade.trade_direction):
+                if self.pair_state_journal is not None:
+                    self.pair_state_journal.remove(trade.pair, trade.trade_direction)
 
-            if custompairkey in self.custom_info:
-                del self.custom_info[custompairkey]
+                self.log(f"Removed run-time state for '{self.get_custom_pairkey(trade.pair, trade.trade_direction)}'")
 
-                self.log(f"Removed custom data storage for '{custompairkey}'")
-
-        # Determine max number of trades
-        self.update_max_trade_count()
+        # Update the trades in stoploss (and max number of trades) for the changed trade
+        self.update_trade_stoploss_state(trade, order.safe_price)
 
         return None
 
@@ -333,15 +561,9 @@ class BaseStrategy(IStrategy):
         :return: A leverage amount, which is between 1.0 and max_leverage.
         """
 
-        leverage = 1.0
-
-        pairkey = f"{pair}_{side}"
-        if pairkey in self.leverage_configuration:
-            leverage = self.leverage_configuration[pairkey]
-        elif 'default' in self.leverage_configuration:
-            leverage =  self.leverage_configuration['default']
+        leverage = self.pair_configs.get(pair, side).leverage
 
-        self.log(f"Returning leverage '{leverage}' for pair {pair} and side {side}. Configuration = {self.leverage_configuration}")
+        self.log("Returning leverage '%s' for pair %s and side %s. Configuration = %s", args=(leverage, pair, side, self.leverage_configuration))
 
         return leverage
 
@@ -368,21 +590,66 @@ class BaseStrategy(IStrategy):
         :return float: New stoploss value, relative to the current rate
         """
 
+        # Track if the stoploss of this trade became (in)active
+        self.update_trade_stoploss_state(trade, current_rate)
+
         return None
 
 
-    def create_custom_data(self, pair_key):
+    def create_pair_state(self, pair: str, side: str) -> PairState:
         """
-        Create the custom data contact for storage during the runtime of this bot.
+        Create the run-time state of a pair and side, used by `pair_states`. Strategies
+        requiring additional fields return a subclass of PairState.
 
-        :param pair_key: The key to create the data for.
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :return PairState: The initial state
+        """
+
+        return PairState(pair, side)
+
+
+    def journal_pair_state(self, state: PairState) -> None:
+        """
+        Record the run-time state of a pair and side in the journal, after it has changed.
+
+        :param state: The changed state
         """
 
-        if not pair_key in self.custom_info:
-            # Create empty entry for this trade
-            self.custom_info[pair_key] = {}
+        if self.pair_state_journal is not None:
+            self.pair_state_journal.record(state.pair, state.side, state.as_dict())
+
+
+    def restore_pair_state(self, state: PairState) -> bool:
+        """
+        Restore the run-time state of a pair and side as stored in the journal before the restart.
+
+        :param state: The (initial) state to restore
+        :return bool: True if a stored state was found
+        """
+
+        fields = self.custom_info['journal-states'].pop((state.pair, state.side), None)
+        if fields is None:
+            return False
+
+        state.restore(fields)
+
+        self.log("%s: restored run-time state from journal: %s", args=(state.pair, state))
 
-            self.log(f"Created custom data storage for pair {pair_key}.")
+        return True
+
+
+    def compact_state_journal(self) -> None:
+        """
+        Rewrite the journal with only the current run-time states. States read from the
+        journal and not restored (trades closed during the restart) are dropped.
+        """
+
+        if self.pair_state_journal is None:
+            return
+
+        self.custom_info['journal-states'].clear()
+        self.pair_state_journal.compact({(state.pair, state.side): state.as_dict() for state in self.pair_states})
 
 
     def get_custom_pairkey(self, pair: str, side: str) -> str:
@@ -394,7 +661,24 @@ class BaseStrategy(IStrategy):
         :return str: The composed pairkey
         """
 
-        return f"{pair}_{side}"
+        return self.pair_configs.get(pair, side).pairkey
+
+
+    def create_pair_config(self, pair: str, side: str, config_class=PairConfig) -> PairConfig:
+        """
+        Resolve the configuration of a pair and side, used by `pair_configs`. Strategies with
+        additional configuration override this to bind it, using a subclass of PairConfig.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :param config_class: Class of the configuration to create
+        :return PairConfig: The resolved configuration
+        """
+
+        config = config_class(pair, side)
+        config.leverage = self.leverage_configuration.get(config.pairkey, self.leverage_configuration.get('default', 1.0))
+
+        return config
 
 
     def get_round_digits(self, pair: str) -> int:
@@ -415,37 +699,105 @@ class BaseStrategy(IStrategy):
         return numberofdigits
 
 
-    def log(self, message: str, level='INFO', notify=None):
+    def log(self, message: str, level='INFO', notify=None, args: tuple = (), pair: str = None, category: str = None):
         """
         Function for logging data on a certain level Can also send
         a notification. For WARNING and ERROR the nofication is always send.
 
+        The message is only formatted when the level is enabled (or a notification
+        is send). Pass expensive values (dca tables, dicts) in `args` and use %-style
+        placeholders in the message, so they are not formatted when not logged.
+
         :param message: Message to log and optionally send in a notification
         :param level: The level of the message
         :param notify: Indication if a notification should be send
+        :param args: Optional arguments for the %-style placeholders in the message
+        :param pair: Pair the notification is about, used for debouncing notifications
+        :param category: Category of the notification, used for debouncing (defaults to the level)
         """
 
         send_notification = False if notify is None else notify
+        if level in ('WARNING', 'ERROR'):
+            send_notification = True if notify is None else notify # Force notification
 
-        if self.logger:
+        loglevel = LOG_LEVELS.get(level)
+        if self.logger and loglevel is not None and self.logger.isEnabledFor(loglevel):
             dt_utc = datetime.now(timezone.utc)
 
-            timedmsg = f"UTC {dt_utc.strftime('%Y-%m-%d %H:%M:%S')} - {message}"
-
-            match level:
-                case 'INFO':
-                    self.logger.info(timedmsg)
-                case 'DEBUG':
-                    self.logger.debug(timedmsg)
-                case 'WARNING':
-                    self.logger.warning(timedmsg)
-                    send_notification = True if notify is None else notify # Force notification
-                case 'ERROR':
-                    self.logger.error(timedmsg)
-                    send_notification = True if notify is None else notify # Force notification
+            self.logger.log(loglevel, f"UTC {dt_utc.strftime('%Y-%m-%d %H:%M:%S')} - " + message, *args)
 
         if send_notification:
-            self.dp.send_msg(message)
+            self.send_notification(message % args if args else message, pair, category or level.lower(),
+                                   urgent=level in ('WARNING', 'ERROR'))
+
+
+    def send_notification(self, message: str, pair: str = None, category: str = None, urgent: bool = False):
+        """
+        Send a notification, unless it's suppressed by the debounce windows or the cap on
+        messages per minute. In digest mode the message is collected and send later on.
+        Urgent notifications (warnings and errors) are always send right away.
+
+        :param message: Message to send
+        :param pair: Pair the message is about, if any
+        :param category: Category of the message
+        :param urgent: Send the message right away, without throttling
+        """
+
+        for notification in self.notification_throttle.submit(message, pair, category, urgent=urgent):
+            self.dp.send_msg(notification)
+
+
+    def flush_notifications(self, force=False):
+        """
+        Send the collected notifications when digest mode is enabled and the interval has passed.
+
+        :param force: Send the collected notifications right away
+        """
+
+        for notification in self.notification_throttle.flush(force=force):
+            self.dp.send_msg(notification)
+
+
+    def instrument_callbacks(self):
+        """
+        Wrap the callbacks listed in `latency_callbacks` on this instance, so the duration
+        of every call is recorded per callback and pair.
+        """
+
+        self.latency_recorder = LatencyRecorder()
+
+        for name in self.latency_callbacks:
+            callback = getattr(self, name, None)
+            if callable(callback):
+                setattr(self, name, self.latency_recorder.wrap(name, callback))
+
+
+    def report_latency(self):
+        """
+        Log a summary of the callback durations, and write the Prometheus file when configured.
+        """
+
+        if self.latency_recorder is None:
+            return
+
+        for name, stats in self.latency_recorder.summary().items():
+            self.log(
+                "Latency %s: %d calls, p50 %.2fms, p95 %.2fms, p99 %.2fms, max %.2fms.",
+                args=(name, stats['count'], stats['p50'] * 1000, stats['p95'] * 1000, stats['p99'] * 1000, stats['max'] * 1000)
+            )
+
+        for (name, pair), stats in self.latency_recorder.summary(per_pair=True).items():
+            self.log(
+                "Latency %s for %s: %d calls, p50 %.2fms, p95 %.2fms, p99 %.2fms, max %.2fms.",
+                "DEBUG",
+                args=(name, pair, stats['count'], stats['p50'] * 1000, stats['p95'] * 1000, stats['p99'] * 1000, stats['max'] * 1000)
+            )
+
+        if self.latency_prometheus_file:
+            try:
+                self.latency_recorder.write_prometheus(self.latency_prometheus_file)
+            except OSError as e:
+                self.log(f"Failed to write latency statistics to '{self.latency_prometheus_file}': {e}", "WARNING", False)
 
 
     def log_dataframe(self, df: DataFrame, msg="", number_of_rows=5):
@@ -458,7 +810,7 @@ class BaseStrategy(IStrategy):
         """
         
         self.log(
-            f"{msg}: {df.tail(number_of_rows)}"
+            "%s: %s", args=(msg, df.tail(number_of_rows))
         )
 
 
@@ -510,8 +862,12 @@ class BaseStrategy(IStrategy):
     def cache_dataframe(self, df: DataFrame, pair: str, tf: str):
         """
         Store (or update) a dataframe for a certain pair and timeframe in the cache.
-        The dataframe is copied to make sure no alternations are made, and the 
-        current time will be stored in order to clean-up things later.
+        The dataframe is copied to make sure no alternations are made. The entry expires
+        when it hasn't been updated within the timeframe (with a margin of two minutes).
+        Least recently used entries are evicted when the cache exceeds its memory budget.
+
+        In 'append' mode only the candles newer than the last cached candle are copied,
+        all candles are copied again when the history of the dataframe changed.
 
         :param df: Dataframe to store
         :param pair: Pair the Dataframe belongs to
@@ -520,19 +876,45 @@ class BaseStrategy(IStrategy):
 
         key = f"{pair}_{tf}"
         if not key in self.custom_info['cache']:
-            # Create empty entry for this trade
-            self.custom_info['cache'][key] = {}
-            self.custom_info['cache'][key]['tf'] = tf
-
             self.log(f"Created custom cache storage for {key}.")
 
-        self.custom_info['cache'][key]['df'] = df.copy()
-        self.custom_info['cache'][key]['datetime'] = datetime.now()
+        self.store_in_cache(key, df, tf)
+
+        if self.custom_info['persistent-cache'] is not None:
+            self.custom_info['persistent-cache'].mark_dirty(pair, tf, key)
+
+
+    def store_in_cache(self, key: str, df: DataFrame, tf: str):
+        """
+        Store the dataframe in the memory cache, using the configured storage mode.
+
+        :param key: Key to store the dataframe under
+        :param df: Dataframe to store
+        :param tf: Timeframe the Dataframe belongs to
+        """
+
+        ttl = (timeframe_to_minutes(tf) + 2) * 60
+
+        if self.dataframe_cache_mode == 'append':
+            frame = self.custom_info['cache'].peek(key)
+            if frame is None:
+                frame = AppendOnlyFrame(df)
+            elif frame.append(df) < 0:
+                self.log(f"History of {key} changed; copied all candles to the cache again.", "DEBUG")
+
+            self.custom_info['cache'].set(key, frame, ttl, frame.nbytes, candle_marker(df))
+        else:
+            self.custom_info['cache'].set(key, df.copy(), ttl, marker=candle_marker(df))
 
 
     def get_dataframe_from_cache(self, pair: str, tf: str) -> DataFrame:
         """
-        Get a dataframe from the cache, if present.
+        Get a dataframe from the cache, if present. In 'append' mode the returned dataframe
+        is a read-only view; values can't be changed in place, but columns can be added.
+
+        With the persistent cache enabled, the first request after a restart loads the
+        dataframe from disk. It can be older than the current candles, so use
+        `get_cache_delta` to determine which candles must be calculated.
 
         :param pair: The pair to get the dataframe for
         :param tf: The timeframe to the dataframe for
@@ -540,10 +922,14 @@ class BaseStrategy(IStrategy):
         """
 
         key = f"{pair}_{tf}"
-        if key in self.custom_info['cache']:
-            return self.custom_info['cache'][key]['df']
 
-        return None
+        self.load_persistent_cache(pair, tf)
+
+        cached = self.custom_info['cache'].get(key)
+        if isinstance(cached, AppendOnlyFrame):
+            return cached.view()
+
+        return cached
 
 
     def refresh_data_required(self, old_df: DataFrame, new_df: DataFrame) -> bool:
@@ -559,34 +945,101 @@ class BaseStrategy(IStrategy):
         refresh = False
         if old_df is None:
             refresh = True
-        else:
-            last_old_candle = old_df.iloc[-1].squeeze()
-            last_new_candle = new_df.iloc[-1].squeeze()
-
-            if last_old_candle['date'] != last_new_candle['date']:
-                refresh = True
+        elif old_df['date'].iat[-1] != new_df['date'].iat[-1]:
+            refresh = True
 
         return refresh
 
 
-    def cleanup_cache(self):
+    def get_cache_delta(self, pair: str, tf: str, new_df: DataFrame) -> int:
         """
-        Cleanup the cache with stored dataframes if the last updated time has passed (with a margin of two minutes).
+        Determine how many candles of the new dataframe are not in the cache yet. Uses the
+        (last date, row count) stored with the cached dataframe, so the cached dataframe
+        itself is not accessed. Callers can use the result to recalculate only the tail.
+
+        :param pair: Pair the Dataframe belongs to
+        :param tf: Timeframe the Dataframe belongs to
+        :param new_df: Current DataFrame
+        :return int: Number of new rows (0 when the cache is up to date), or HISTORY_REWRITTEN (-1)
+                     when nothing is cached or the new dataframe doesn't continue the cached one
         """
 
-        outdatedkeys = []
+        key = f"{pair}_{tf}"
+
+        self.load_persistent_cache(pair, tf)
+        marker = self.custom_info['cache'].marker(key)
+
+        return candle_delta(marker, new_df, timeframe_to_minutes(tf) * 60 * 1_000_000_000)
 
-        currentdatetime = datetime.now()
-        for key in self.custom_info['cache']:
-            minutes = (currentdatetime - self.custom_info['cache'][key]['datetime']).total_seconds() / 60
-            
-            if (minutes - 2) > timeframe_to_minutes(self.custom_info['cache'][key]['tf']):
-                outdatedkeys.append(key)
 
-                self.log(f"Removing cache storage for '{key}' because last update was {minutes} minutes ago")
+    def load_persistent_cache(self, pair: str, tf: str):
+        """
+        Load the dataframe for the pair and timeframe from the persistent cache into the memory
+        cache, when it's not in memory yet. The disk is only read once per pair and timeframe.
+
+        :param pair: The pair to load the dataframe for
+        :param tf: The timeframe to load the dataframe for
+        """
+
+        persistentcache = self.custom_info['persistent-cache']
+        if persistentcache is None:
+            return
+
+        key = f"{pair}_{tf}"
+        if self.custom_info['cache'].peek(key) is not None:
+            return
+
+        df = persistentcache.load(pair, tf)
+        if df is not None:
+            self.store_in_cache(key, df, tf)
+
+            self.log(f"Loaded {len(df)} candles for {key} from the persistent cache.")
+
+
+    def flush_persistent_cache(self):
+        """
+        Write the dataframes updated since the last flush to the persistent cache.
+        """
+
+        persistentcache = self.custom_info['persistent-cache']
+        if persistentcache is None:
+            return
+
+        def get_dataframe(key):
+            # Don't use get_dataframe_from_cache, to keep the cache statistics and LRU order as they are
+            cached = self.custom_info['cache'].peek(key)
+            return cached.view() if isinstance(cached, AppendOnlyFrame) else cached
+
+        written = persistentcache.flush(get_dataframe)
+
+        self.log("Persistent cache: wrote %s file(s). Statistics: %s", "DEBUG", args=(written, persistentcache.stats()))
+
+
+    def get_indicator_parameters(self) -> dict:
+        """
+        Get the parameters influencing the calculated indicators. Cached dataframes on disk
+        are only used when these parameters didn't change. Derived strategies should add
+        their own indicator settings.
+
+        :return dict: Indicator parameters
+        """
+
+        return {
+            'strategy': self.__class__.__name__,
+            'version': self.version(),
+            'timeframe': self.timeframe
+        }
+
+
+    def cleanup_cache(self):
+        """
+        Cleanup the cache with stored dataframes if the last updated time has passed (with a margin of two minutes).
+        Expired entries are also dropped on lookup, so this only releases memory earlier.
+        """
 
+        outdatedkeys = self.custom_info['cache'].cleanup()
         for key in outdatedkeys:
-            del self.custom_info['cache'][key]
+            self.log(f"Removed cache storage for '{key}' because it was not updated within its timeframe")
 
 
     def update_max_trade_count(self):
@@ -619,32 +1072,156 @@ class BaseStrategy(IStrategy):
             )
 
 
-    def get_trade_stoploss_count(self):
+    def fetch_tickers(self, pairs: list) -> dict:
         """
-        Get the number of trades with an active stoploss
+        Fetch the tickers of the pairs through the DataProvider. It offers no bulk call, so
+        every pair is fetched separately; the ticker snapshot makes sure this happens only
+        once per time to live, for all callers together.
+
+        :param pairs: Pairs to fetch the ticker for
+        :return dict: Ticker per pair
+        """
+
+        return {pair: self.dp.ticker(pair) for pair in pairs}
+
+
+    def log_ticker_error(self, exception: Exception):
+        """
+        Log a failure to fetch the tickers. The previous ticker snapshot remains in use.
+
+        :param exception: The error raised while fetching
+        """
+
+        age = self.ticker_snapshot.age
+        self.log(
+            "Failed to fetch tickers (%s: %s); continuing with tickers fetched %s.",
+            "WARNING",
+            notify=False,
+            args=(type(exception).__name__, exception, f"{age:.2f}s ago" if age is not None else "never")
+        )
+
+
+    def get_trade_stoploss_count(self) -> int:
+        """
+        Get the number of trades with an active stoploss, as tracked by the callbacks.
+
+        :return int: Number of trades in stoploss
+        """
+
+        return len(self.custom_info.get('stoploss-trades', ()))
+
+
+    def is_trade_in_stoploss(self, trade: Trade, current_rate: float) -> bool:
+        """
+        Check if the stoploss of a trade is active, based on the distance between the rate and stoploss.
+
+        :param trade: Trade to check
+        :param current_rate: Current rate of the pair
+        :return bool: True when the stoploss is active
+        """
+
+        # calculate distance to stoploss
+        stoploss_current_dist = trade.stop_loss - current_rate
+        stoploss_current_dist_ratio = stoploss_current_dist / current_rate
+
+        self.log(
+            "%s: current_rate is %s. Stoploss is %s (%s%%). SL distance is %s with ratio %s.",
+            "DEBUG",
+            args=(trade.pair, current_rate, trade.stop_loss, trade.stop_loss_pct, stoploss_current_dist, stoploss_current_dist_ratio)
+        )
+
+        return fabs(trade.initial_stop_loss_pct - stoploss_current_dist_ratio) > 0.1
+
+
+    def update_trade_stoploss_state(self, trade: Trade, current_rate: float = None) -> bool:
+        """
+        Update the set of trades in stoploss for one trade. Closed trades are removed. When the
+        set changes, the max number of active trades is updated.
+
+        :param trade: Trade of which the stoploss (or rate) changed
+        :param current_rate: Current rate of the pair; not required for closed trades
+        :return bool: True when the set of trades in stoploss changed
         """
 
-        trade_count = 0
+        if not self.enable_improved_trade_count:
+            return False
+
+        stoplosstrades = self.custom_info['stoploss-trades']
+
+        active = trade.is_open and bool(current_rate) and self.is_trade_in_stoploss(trade, current_rate)
+        if active == (trade.id in stoplosstrades):
+            return False
+
+        if active:
+            stoplosstrades.add(trade.id)
+            self.log(f"{trade.pair}: stoploss is active!", "DEBUG")
+        else:
+            stoplosstrades.discard(trade.id)
+            self.log(f"{trade.pair}: stoploss is no longer active.", "DEBUG")
+
+        self.update_max_trade_count()
+
+        return True
+
+
+    def scan_trade_stoploss_ids(self) -> set:
+        """
+        Determine the trades with an active stoploss by checking all open trades.
+
+        :return set: Ids of the trades in stoploss
+        """
+
+        tradeids = set()
 
         opentrades = Trade.get_trades_proxy(is_open=True)
+        if len(opentrades) == 0:
+            return tradeids
+
+        tickers = self.ticker_snapshot.get([opentrade.pair for opentrade in opentrades])
+
+        age = self.ticker_snapshot.age
+        self.log(
+            "Using tickers of %d pairs, fetched %s.",
+            "DEBUG",
+            args=(len(tickers), f"{age:.2f}s ago" if age is not None else "never")
+        )
+
         for opentrade in opentrades:
-            ticker = self.dp.ticker(opentrade.pair)
-            current_rate = ticker['last']
+            current_rate = tickers.get(opentrade.pair, {}).get('last')
+            if not current_rate:
+                self.log(f"{opentrade.pair}: no ticker available; skipped for stoploss count.", "DEBUG")
+                continue
+
+            if self.is_trade_in_stoploss(opentrade, current_rate):
+                tradeids.add(opentrade.id)
 
-            # calculate distance to stoploss
-            stoploss_current_dist = opentrade.stop_loss - current_rate
-            stoploss_current_dist_ratio = stoploss_current_dist / current_rate
+        return tradeids
 
+
+    def rescan_trade_stoploss_ids(self, current_time: datetime = None):
+        """
+        Consistency check of the tracked trades in stoploss. Rescans all open trades, logs the
+        difference with the tracked set (drift) and replaces the tracked set.
+
+        :param current_time: Time of the rescan
+        """
+
+        if not self.enable_improved_trade_count:
+            return
+
+        tradeids = self.scan_trade_stoploss_ids()
+        tracked = self.custom_info['stoploss-trades']
+
+        added = tradeids - tracked
+        removed = tracked - tradeids
+        if added or removed:
             self.log(
-                f"{opentrade.pair}: current_rate is {current_rate}. Stoploss is {opentrade.stop_loss} ({opentrade.stop_loss_pct}%). SL distance is {stoploss_current_dist} with ratio {stoploss_current_dist_ratio}.",
-                "DEBUG"
+                f"Drift in tracked trades in stoploss: {len(added)} trade(s) missing {sorted(added)}, "
+                f"{len(removed)} trade(s) no longer in stoploss {sorted(removed)}. Corrected by rescan.",
+                "DEBUG" if self.custom_info['stoploss-rescan'] == datetime.min else "INFO"
             )
 
-            if fabs(opentrade.initial_stop_loss_pct - stoploss_current_dist_ratio) > 0.1:
-                self.log(
-                    f"{opentrade.pair}: stoploss is active!",
-                    "DEBUG"
-                )
-                trade_count += 1
+        self.custom_info['stoploss-trades'] = tradeids
+        self.custom_info['stoploss-rescan'] = (current_time or datetime.now(timezone.utc)).replace(tzinfo=None)
 
-        return trade_count
\ No newline at end of file
+        self.update_max_trade_count()
\ No newline at end of file
@@ -16,7 +16,10 @@ from freqtrade.strategy import (BooleanParameter, CategoricalParameter, DecimalP
 import talib.abstract as ta
 import pandas_ta as pta
 
-from indicators.supertrend import supertrend
+from freqtrade.enums import RunMode
+from freqtrade.exchange import timeframe_to_minutes
+
+from indicators.supertrend import supertrend, SupertrendStream
 
 from dca_strategy import DCAStrategy
 class BaseSupertrendStrategy(DCAStrategy):
@@ -56,6 +59,9 @@ class BaseSupertrendStrategy(DCAStrategy):
     supertrend_source = ""
     supertrend_change_atr = False
 
+    # Only calculate the new candles for the Supertrend when running live or dry-run
+    supertrend_incremental = True
+
     @property
     def plot_config(self):
         return {
@@ -76,6 +82,19 @@ class BaseSupertrendStrategy(DCAStrategy):
         }
 
 
+    def bot_start(self, **kwargs) -> None:
+        """
+        Called only once after bot instantiation.
+        :param **kwargs: Ensure to keep this here so updates to this won't break your strategy.
+        """
+
+        # Call to super first
+        super().bot_start()
+
+        # Setup storage for the incremental Supertrend per pair, timeframe and settings
+        self.custom_info['supertrend'] = {}
+
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Adds several different TA indicators to the given DataFrame
@@ -90,13 +109,16 @@ class BaseSupertrendStrategy(DCAStrategy):
 
         dataframe = super().populate_indicators(dataframe, metadata)
         
-        # Supertrend
-        column_postfix = f"_{self.supertrend_length}_{self.supertrend_multiplier}"
-        sti = supertrend(dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'], self.supertrend_length, self.supertrend_multiplier, self.supertrend_source, self.supertrend_change_atr)
-        dataframe['trend'] = sti[f'SUPERT{column_postfix}']
-        dataframe['direction'] = sti[f'SUPERTd{column_postfix}']
-        dataframe['long'] = sti[f'SUPERTl{column_postfix}']
-        dataframe['short'] = sti[f'SUPERTs{column_postfix}']
+        # Supertrend, written directly into the 'trend', 'direction', 'long' and 'short' columns
+        live = self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN)
+        if self.supertrend_incremental and live:
+            self.get_supertrend_stream(metadata['pair'], self.timeframe).update(dataframe, target=dataframe)
+        else:
+            # Live the same candles can be analyzed on every loop until the next candle arrives, which
+            # hits the cache. Backtesting and hyperopt calculate the history of a pair only once
+            cache = self.indicator_cache.frame(metadata['pair'], self.timeframe, dataframe) if live else None
+            supertrend(dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'], self.supertrend_length, self.supertrend_multiplier, self.supertrend_source, self.supertrend_change_atr,
+                       target=dataframe, cache=cache)
 
         # Inspect the last 5 rows
         #if self.logger:
@@ -104,4 +126,44 @@ class BaseSupertrendStrategy(DCAStrategy):
         #        f"populate_indicators:\n{dataframe.tail()}"
         #    )
 
-        return dataframe
\ No newline at end of file
+        return dataframe
+
+
+    def get_indicator_parameters(self) -> dict:
+        """
+        Get the parameters influencing the calculated indicators, including the Supertrend settings.
+
+        :return dict: Indicator parameters
+        """
+
+        parameters = super().get_indicator_parameters()
+        parameters['supertrend'] = {
+            'length': self.supertrend_length,
+            'multiplier': self.supertrend_multiplier,
+            'source': self.supertrend_source,
+            'change_atr': self.supertrend_change_atr
+        }
+
+        return parameters
+
+
+    def get_supertrend_stream(self, pair: str, tf: str) -> SupertrendStream:
+        """
+        Get the incremental Supertrend for the pair and timeframe, using the configured
+        Supertrend settings. Created when not present yet.
+
+        :param pair: Pair to get the Supertrend for
+        :param tf: Timeframe to get the Supertrend for
+        :return SupertrendStream: The Supertrend state
+        """
+
+        key = (pair, tf, self.supertrend_length, self.supertrend_multiplier, self.supertrend_source)
+        if key not in self.custom_info['supertrend']:
+            self.custom_info['supertrend'][key] = SupertrendStream(
+                self.supertrend_length, self.supertrend_multiplier, self.supertrend_source,
+                self.supertrend_change_atr, timeframe_to_minutes(tf)
+            )
+
+            self.log(f"Created incremental Supertrend storage for {key}.")
+
+        return self.custom_info['supertrend'][key]
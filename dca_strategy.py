@@ -15,6 +15,10 @@ from freqtrade.constants import Config
 from freqtrade.exchange.exchange_utils_timeframe import timeframe_to_minutes
 from freqtrade.persistence import Order, Trade
 
+from utils.config_levels import compile_level_tables, get_level_table
+from utils.dca_table import DCALadder, decode_dca_table, encode_dca_table
+from utils.pair_config import DCAPairConfig, resolve_config_key
+from utils.pair_state import DCAPairState
 from .base_strategy import BaseStrategy
 class DCAStrategy(BaseStrategy):
     """
@@ -97,6 +101,16 @@ class DCAStrategy(BaseStrategy):
 
     patch_dca_table = False
 
+    # Store the DCA table of a trade in a compact (packed) format instead of a list of dicts
+    compact_dca_table = True
+
+    # DCA tables build from the Safety Order configuration, per config pair key, stake amount and bo:so
+    dca_table_templates = {}
+
+    # Levels of the trailing and profit configuration per config pair key, compiled for lookup by bisection
+    trailing_levels = {}
+    profit_levels = {}
+
 
     def version(self) -> Optional[str]:
         """
@@ -115,6 +129,10 @@ class DCAStrategy(BaseStrategy):
         # Call to super
         super().__init__(config)
 
+        self.dca_table_templates = {}
+        self.trailing_levels = {}
+        self.profit_levels = {}
+
         # Try to get the trading direction from the config and validate when present
         if 'trading_direction' in config:
             if config['trading_direction'] in ('long', 'short', 'long_short'):
@@ -151,6 +169,10 @@ class DCAStrategy(BaseStrategy):
             if isinstance(config['patch_dca_table'], bool):
                 self.patch_dca_table = config['patch_dca_table']
 
+        if 'compact_dca_table' in config:
+            if isinstance(config['compact_dca_table'], bool):
+                self.compact_dca_table = config['compact_dca_table']
+
         bo_so = 1.0
         if 'bo:so' in config:
             if isinstance(config['bo:so'], str):
@@ -197,6 +219,10 @@ class DCAStrategy(BaseStrategy):
                     else:
                         l[k] = float(v)
 
+        # Compile the level tables from the (corrected) configuration
+        self.compile_trailing_levels()
+        self.compile_profit_levels()
+
         # Process Safety Order configuration...
         for pairkey in self.safety_order_configuration:
             if pairkey != 'default':
@@ -238,6 +264,12 @@ class DCAStrategy(BaseStrategy):
         super().bot_start()
         self.log(f"Version - DCA Strategy: '{DCAStrategy.version(self)}'")
 
+        # Setup cache of the DCA tables of the open trades (per trade id), loaded below
+        self.custom_info['dca-tables'] = {}
+
+        # Setup rates (per trade id) on which the next Safety Order or trailing could trigger
+        self.custom_info['safety-order-triggers'] = {}
+
         self.log(f"Running with trading direction(s): '{self.trading_direction}'")
         self.log(f"Running with bo:so: '{self.trade_bo_so_ratio}'")
         self.log(f"Running with custom stoploss: '{self.use_custom_stoploss}'")
@@ -275,10 +307,10 @@ class DCAStrategy(BaseStrategy):
         opentrades = Trade.get_trades_proxy(is_open=True)
         for opentrade in opentrades:
             # Check pressence of dca table
-            trade_dca_tbl = opentrade.get_custom_data(key='dca_table')
+            trade_dca_tbl = self.get_dca_table(opentrade)
             if trade_dca_tbl is None:
                 trade_dca_tbl = self.get_initial_dca_table(opentrade.pair, opentrade.trade_direction)
-                opentrade.set_custom_data(key='dca_table', value=trade_dca_tbl)
+                self.store_dca_table(opentrade, trade_dca_tbl)
                 self.log(f"{opentrade.pair}: added initial dca table")
             elif self.patch_dca_table:
                 dca_tbl = self.get_initial_dca_table(opentrade.pair, opentrade.trade_direction)
@@ -289,11 +321,11 @@ class DCAStrategy(BaseStrategy):
                 if configuredcount > currentcount:
                     shift_percentage = trade_dca_tbl[-1]['total_deviation_current'] - trade_dca_tbl[-1]['total_deviation_initial']
 
-                    trade_dca_tbl += dca_tbl[currentcount:]
+                    trade_dca_tbl.extend(dca_tbl[currentcount:])
 
                     self.shift_dca_table(trade_dca_tbl, currentcount + 1, shift_percentage, True)
 
-                    opentrade.set_custom_data(key='dca_table', value=trade_dca_tbl)
+                    self.store_dca_table(opentrade, trade_dca_tbl)
 
                     self.log(
                         f"{opentrade.pair}: patched dca_tbl by copying orders from {currentcount} to {configuredcount}. "
@@ -306,19 +338,19 @@ class DCAStrategy(BaseStrategy):
                             trade_dca_tbl = trade_dca_tbl[0:0]
                             trade_dca_tbl += dca_tbl[0:]
 
-                            opentrade.set_custom_data(key='dca_table', value=trade_dca_tbl)
+                            self.store_dca_table(opentrade, trade_dca_tbl)
 
                             self.log(f"{opentrade.pair}: patched dca_tbl by replacing all Safety Orders as only base order was filled.")
                         else:
                             trade_dca_tbl = trade_dca_tbl[0:configuredcount]
 
-                            opentrade.set_custom_data(key='dca_table', value=trade_dca_tbl)
+                            self.store_dca_table(opentrade, trade_dca_tbl)
 
                             self.log(f"{opentrade.pair}: patched dca_tbl by removing orders after order {configuredcount}.")
                     else:
                         trade_dca_tbl = trade_dca_tbl[0:(count_of_entries - 1)]
 
-                        opentrade.set_custom_data(key='dca_table', value=trade_dca_tbl)
+                        self.store_dca_table(opentrade, trade_dca_tbl)
 
                         self.log(
                             f"{opentrade.pair}: patched dca_tbl by removing only not filled orders after {(count_of_entries - 1)}. "
@@ -326,10 +358,28 @@ class DCAStrategy(BaseStrategy):
                             level="WARNING"
                         )
 
-            self.log(f"{opentrade.pair}: dca table = '{trade_dca_tbl}'")
+            self.log("%s: dca table = '%s'", args=(opentrade.pair, trade_dca_tbl))
+
+            # Resume trailing and open Safety Orders as they were before the restart
+            self.initialize_pair_state(opentrade.pair, opentrade.trade_direction, restore=True)
 
-            custompairkey = self.get_custom_pairkey(opentrade.pair, opentrade.trade_direction)
-            self.initialize_custom_data(custompairkey)
+        # Keep only the states of the open trades in the journal
+        self.compact_state_journal()
+
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        """
+        Called at the start of the bot iteration (one loop).
+        :param current_time: datetime object, containing the current datetime
+        :param **kwargs: Ensure to keep this here so updates to this won't break your strategy.
+        """
+
+        super().bot_loop_start(current_time)
+
+        # The profit of a trade also depends on fees changing over time (funding); calculate the
+        # trigger rates again once every five minutes
+        if current_time.minute % 5 == 0 and current_time.second <= 8:
+            self.custom_info['safety-order-triggers'].clear()
 
 
     def confirm_trade_entry(self, pair: str, order_type: str, amount: float, rate: float,
@@ -409,7 +459,7 @@ class DCAStrategy(BaseStrategy):
                 self.lock_pair(pair, until=current_time + timedelta(minutes=timeframe_to_minutes(self.timeframe)), reason="Min order limits could not be statisfied")
                 return False
 
-        self.initialize_custom_data(pairkey)
+        self.initialize_pair_state(pair, side)
 
         return True
 
@@ -474,19 +524,20 @@ class DCAStrategy(BaseStrategy):
         :return float: New stoploss value, relative to the current_rate
         """
 
-        # Create pairkey, or use 'default' 
-        custompairkey, configpairkey = self.get_pairkeys(trade.pair, trade.trade_direction, 'Profit')
+        # Get the configuration (pair or 'default') and run-time state of the pair and side
+        pairconfig = self.pair_configs.get(trade.pair, trade.trade_direction)
+        pairstate = self.pair_states.get(trade.pair, trade.trade_direction)
 
         # Get SL values from config
         current_profit_percentage = current_profit * 100.0
-        sl_enabled, activation_percentage, sl_percentage, sl_factor, sl_min_orders = self.get_stoploss_config(current_profit_percentage, configpairkey)
+        sl_enabled, activation_percentage, sl_percentage, sl_factor, sl_min_orders = self.get_stoploss_level(pairconfig.profit_levels, current_profit_percentage)
 
         # Call base
         new_stoploss = super().custom_stoploss(pair, trade, current_time, current_rate, current_profit, after_fill)
 
         # Calculate new stoploss, when enabled and profit has increased
         if sl_enabled and trade.nr_of_successful_entries >= sl_min_orders:
-            if current_profit_percentage > self.custom_info[custompairkey]['last_profit_percentage']:
+            if current_profit_percentage > pairstate.last_profit_percentage:
                 # Calculate stoploss percentage based on the config and current profit
                 stoploss_percentage = sl_percentage + ((current_profit_percentage - activation_percentage) * sl_factor)
 
@@ -494,23 +545,24 @@ class DCAStrategy(BaseStrategy):
                 new_stoploss = current_profit_percentage - stoploss_percentage
 
                 self.log(
-                    f"{trade.pair}: profit increased from {self.custom_info[custompairkey]['last_profit_percentage']:.2f}% "
+                    f"{trade.pair}: profit increased from {pairstate.last_profit_percentage:.2f}% "
                     f"to {current_profit_percentage:.2f}%. Updating stoploss to {stoploss_percentage:.2f}% ({new_stoploss:.2f}%) based on "
                     f"initial SL {sl_percentage:.2f}% and factor {sl_factor:.2f}%",
                     notify=False
                 )
 
-                self.custom_info[custompairkey]['last_profit_percentage'] = current_profit_percentage
+                pairstate.last_profit_percentage = current_profit_percentage
+                self.journal_pair_state(pairstate)
 
                 # Convert to ratio instead of percentage for framework
                 new_stoploss /= 100.0
             else:
                 self.log(
-                    f"{trade.pair}: profit {current_profit_percentage:.2f} below {self.custom_info[custompairkey]['last_profit_percentage']:.2f}% "
+                    f"{trade.pair}: profit {current_profit_percentage:.2f} below {pairstate.last_profit_percentage:.2f}% "
                     f"not changing the stoploss percentage."
                 )
-        #elif self.custom_info[custompairkey]['last_profit_percentage'] != 0.0:
-        #    self.custom_info[custompairkey]['last_profit_percentage'] = float(0.0)
+        #elif pairstate.last_profit_percentage != 0.0:
+        #    pairstate.last_profit_percentage = float(0.0)
 
         return new_stoploss
 
@@ -528,30 +580,33 @@ class DCAStrategy(BaseStrategy):
 
         super().order_filled(pair, trade, order, current_time)
 
+        # Entry rate and DCA table change on fills; the trigger rate is calculated again when required
+        self.custom_info['safety-order-triggers'].pop(trade.id, None)
+
         if order.ft_order_side == trade.entry_side:
-            custompairkey = self.get_custom_pairkey(trade.pair, trade.trade_direction)
+            pairstate = self.pair_states.get(trade.pair, trade.trade_direction)
 
             # Get number of entry orders
             count_of_entries = trade.nr_of_successful_entries
             if count_of_entries == 1:
                 # Base order filled, add DCA table
                 dca_tbl = self.get_initial_dca_table(trade.pair, trade.trade_direction)
-                trade.set_custom_data(key='dca_table', value=dca_tbl)
+                self.store_dca_table(trade, dca_tbl)
 
-                self.log(f"Initial DCA table added to trade: {dca_tbl}")
+                self.log("Initial DCA table added to trade: %s", args=(dca_tbl,))
 
-            openorders = len(self.custom_info[custompairkey]['open_safety_orders'])
+            openorders = len(pairstate.open_safety_orders)
             if openorders > 0:
                 # Check if the first order from the list has been bought. Remove the bought order and check if there are other
                 # order(s) that should be bought. Keep in mind that an order can timeout on the exchange, in which case this function
                 # is called again and the same volume must be returned (to place the order again)
                 count_of_entries = trade.nr_of_successful_entries
                 count_of_safety_orders = count_of_entries - 1 # Subtract Base Order
-                if self.custom_info[custompairkey]['open_safety_orders'][0]['order'] == count_of_safety_orders:
+                if pairstate.open_safety_orders[0]['order'] == count_of_safety_orders:
                     if self.safety_order_mode == 'shift':
                         # Calculate shift percentage, based on configured SO deviation and actual profit percentage bought on
-                        profit_percentage = self.custom_info[custompairkey]['open_safety_orders'][0]['current_deviation']
-                        safety_order_percentage = self.custom_info[custompairkey]['open_safety_orders'][0]['total_deviation']
+                        profit_percentage = pairstate.open_safety_orders[0]['current_deviation']
+                        safety_order_percentage = pairstate.open_safety_orders[0]['total_deviation']
                         shift_percentage = profit_percentage - safety_order_percentage
 
                         self.log(
@@ -560,9 +615,9 @@ class DCAStrategy(BaseStrategy):
                         )
 
                         # Shift the DCA tabel by this percentage and store it with the trade
-                        dca_table = trade.get_custom_data(key='dca_table')
+                        dca_table = self.get_dca_table(trade)
                         self.shift_dca_table(dca_table, count_of_safety_orders, shift_percentage)
-                        trade.set_custom_data(key='dca_table', value=dca_table)
+                        self.store_dca_table(trade, dca_table)
 
                         self.log(
                             f"{trade.pair}: shifted dca table by {shift_percentage:.4f}% from order {count_of_safety_orders}. "
@@ -570,13 +625,14 @@ class DCAStrategy(BaseStrategy):
                             notify=True
                         )
                         self.log(
-                            f"DCA table: '{dca_table}'."
+                            "DCA table: '%s'.", args=(dca_table,)
                         )
 
-                    self.custom_info[custompairkey]['open_safety_orders'].pop(0)
+                    pairstate.open_safety_orders.pop(0)
+                    self.journal_pair_state(pairstate)
 
                     # Update number of open orders and send notification
-                    openorders = len(self.custom_info[custompairkey]['open_safety_orders'])
+                    openorders = len(pairstate.open_safety_orders)
                     self.log(
                         f"{trade.pair}: Safety Order {count_of_safety_orders} has been bought. "
                         f"There are {openorders} orders left.",
@@ -589,7 +645,7 @@ class DCAStrategy(BaseStrategy):
 
             deviationmsg = ""
             if self.safety_order_mode == 'shift':
-                dca_table = trade.get_custom_data(key='dca_table')
+                dca_table = self.get_dca_table(trade)
                 if len(dca_table) > 0:
                     deviationmsg = f"Max deviation was shifted from {dca_table[-1]['total_deviation_initial']:.4f}% to {dca_table[-1]['total_deviation_current']:.4f}%."
 
@@ -598,6 +654,9 @@ class DCAStrategy(BaseStrategy):
                 notify=True
             )
 
+            # The DCA table of the trade is no longer needed in memory
+            self.custom_info['dca-tables'].pop(trade.id, None)
+
         return None
 
 
@@ -634,6 +693,11 @@ class DCAStrategy(BaseStrategy):
                        Return None for no action.
         """
 
+        # Return when the rate didn't reach the precalculated rate of the next Safety Order (or trailing)
+        triggerrate = self.custom_info['safety-order-triggers'].get(trade.id)
+        if triggerrate is not None and (current_entry_rate < triggerrate if trade.is_short else current_entry_rate > triggerrate):
+            return None
+
         # Return when pair is locked
         if self.is_pair_locked(trade.pair):
             return None
@@ -646,14 +710,15 @@ class DCAStrategy(BaseStrategy):
         if self.max_entry_position_adjustment == -1:
             return None
 
-        # Create pairkey, or use 'default' 
-        custompairkey, configpairkey = self.get_pairkeys(trade.pair, trade.trade_direction, 'Safety')
+        # Get the configuration (pair or 'default') and run-time state of the pair and side
+        pairconfig = self.pair_configs.get(trade.pair, trade.trade_direction)
+        pairstate = self.pair_states.get(trade.pair, trade.trade_direction)
 
         # Return when all Safety Orders are executed
         count_of_entries = trade.nr_of_successful_entries
         count_of_safety_orders = count_of_entries - 1 # Subtract Base Order
 
-        dca_table = trade.get_custom_data(key='dca_table')
+        dca_table = self.get_dca_table(trade)
         max_orders = len(dca_table)
         if count_of_safety_orders >= max_orders:
             self.log(
@@ -664,11 +729,11 @@ class DCAStrategy(BaseStrategy):
 
         rounddigits = self.get_round_digits(trade.pair)
 
-        openorders = len(self.custom_info[custompairkey]['open_safety_orders'])
+        openorders = len(pairstate.open_safety_orders)
         if openorders > 0:
-            pricedeviation = self.custom_info[custompairkey]['open_safety_orders'][0]['current_deviation']
-            totaldeviation = self.custom_info[custompairkey]['open_safety_orders'][0]['total_deviation']
-            volume = self.custom_info[custompairkey]['open_safety_orders'][0]['volume']
+            pricedeviation = pairstate.open_safety_orders[0]['current_deviation']
+            totaldeviation = pairstate.open_safety_orders[0]['total_deviation']
+            volume = pairstate.open_safety_orders[0]['volume']
 
             self.log(
                 f"{trade.pair}: current profit {pricedeviation:.4f}% reached next SO {count_of_entries}/{max_orders} at {totaldeviation:.4f}% "
@@ -679,63 +744,72 @@ class DCAStrategy(BaseStrategy):
             return volume, f"Safety Order {count_of_entries}"
 
         # Calculate the next Safety Order, if not calculated before. Store the calculated value to save some CPU cycles
-        if self.custom_info[custompairkey]['next_safety_order_profit_percentage'] == 0.0:
-            dca_table = trade.get_custom_data(key='dca_table')
+        if pairstate.next_safety_order_profit_percentage == 0.0:
             dca_table_deviation = dca_table[count_of_safety_orders]['total_deviation_current']
 
-            self.custom_info[custompairkey]['next_safety_order_profit_percentage'] = dca_table_deviation
+            pairstate.next_safety_order_profit_percentage = dca_table_deviation
+            self.journal_pair_state(pairstate)
             self.log(
-                f"{trade.pair}: calculated next safety order on {self.custom_info[custompairkey]['next_safety_order_profit_percentage']:.4f}%."
+                f"{trade.pair}: calculated next safety order on {pairstate.next_safety_order_profit_percentage:.4f}%."
             )
 
         # Return when the current (negative) profit hasn't reached the next Safety Order. 
         current_entry_profit_percentage = (current_entry_profit / trade.leverage) * 100.0
-        next_safety_order_percentage = self.custom_info[custompairkey]['next_safety_order_profit_percentage']
+        next_safety_order_percentage = pairstate.next_safety_order_profit_percentage
         if current_entry_profit_percentage > next_safety_order_percentage:
+            self.update_safety_order_trigger(trade, pairstate, pairconfig)
             return None
 
-        tso_enabled, tso_start_percentage, tso_factor = self.get_safety_trailing_config(current_entry_profit_percentage, next_safety_order_percentage, configpairkey)
+        tso_enabled, tso_start_percentage, tso_factor = self.get_safety_trailing_level(pairconfig.trailing_levels, current_entry_profit_percentage, next_safety_order_percentage)
         if tso_enabled:
             # Return when profit is above Safety Order percentage keeping start_percentage into account (and reset data when required)
             if current_entry_profit_percentage > (next_safety_order_percentage - tso_start_percentage):
-                if self.custom_info[custompairkey]['last_profit_percentage'] != 0.0:
-                    self.custom_info[custompairkey]['last_profit_percentage'] = float(0.0)
-                    self.custom_info[custompairkey]['add_safety_order_on_profit_percentage'] = float(0.0)
-                    self.custom_info[custompairkey]['trailing_start_datetime'] = datetime.min
+                if pairstate.last_profit_percentage != 0.0:
+                    pairstate.reset_trailing()
+                    self.journal_pair_state(pairstate)
+                    self.custom_info['safety-order-triggers'].pop(trade.id, None)
 
                     self.log(
                         f"{trade.pair}: current profit {current_entry_profit_percentage:.4f}% went above "
                         f"threshold {(next_safety_order_percentage - tso_start_percentage):.4f}%; reset trailing.",
-                        notify=self.notify_trailing_reset
+                        notify=self.notify_trailing_reset,
+                        pair=trade.pair,
+                        category='trailing-reset'
                     )
                 # Else case: trailing did not start and we don't need to do anything
+                self.update_safety_order_trigger(trade, pairstate, pairconfig)
                 return None
 
             # Increase trailing when profit has increased (in a negative way)
-            if current_entry_profit_percentage < self.custom_info[custompairkey]['last_profit_percentage']:
+            if current_entry_profit_percentage < pairstate.last_profit_percentage:
                 new_threshold = next_safety_order_percentage + ((current_entry_profit_percentage - next_safety_order_percentage) * tso_factor)
 
-                send_notification = ((self.custom_info[custompairkey]['last_profit_percentage'] == 0.0) and self.notify_trailing_start) or self.notify_trailing_update
+                trailing_start = (pairstate.last_profit_percentage == 0.0)
+                send_notification = (trailing_start and self.notify_trailing_start) or self.notify_trailing_update
                 self.log(
-                    f"{trade.pair}: profit from {self.custom_info[custompairkey]['last_profit_percentage']:.4f}% to {current_entry_profit_percentage:.4f}% "
+                    f"{trade.pair}: profit from {pairstate.last_profit_percentage:.4f}% to {current_entry_profit_percentage:.4f}% "
                     f"(trailing from {next_safety_order_percentage:.4f}%). "
-                    f"Safety Order threshold from {self.custom_info[custompairkey]['add_safety_order_on_profit_percentage']:.4f}% to {new_threshold:.4f}%.",
-                    notify=send_notification
+                    f"Safety Order threshold from {pairstate.add_safety_order_on_profit_percentage:.4f}% to {new_threshold:.4f}%.",
+                    notify=send_notification,
+                    pair=trade.pair,
+                    category='trailing-start' if trailing_start else 'trailing'
                 )
 
                 # Set start time only when trailing starts
-                if (self.custom_info[custompairkey]['last_profit_percentage'] == 0.0):
-                    self.custom_info[custompairkey]['trailing_start_datetime'] = datetime.now()
+                if (pairstate.last_profit_percentage == 0.0):
+                    pairstate.trailing_start_datetime = datetime.now()
 
                 # Update trailing position
-                self.custom_info[custompairkey]['last_profit_percentage'] = current_entry_profit_percentage
-                self.custom_info[custompairkey]['add_safety_order_on_profit_percentage'] = new_threshold
+                pairstate.last_profit_percentage = current_entry_profit_percentage
+                pairstate.add_safety_order_on_profit_percentage = new_threshold
+                self.journal_pair_state(pairstate)
+                self.custom_info['safety-order-triggers'].pop(trade.id, None)
 
                 return None
             # Return when profit has not increased, and is still below the thresold value to place a new Safety Order
-            elif current_entry_profit_percentage < self.custom_info[custompairkey]['add_safety_order_on_profit_percentage']:
+            elif current_entry_profit_percentage < pairstate.add_safety_order_on_profit_percentage:
                 self.log(
-                    f"{trade.pair}: profit {current_entry_profit_percentage:.4f}% still below threshold of {self.custom_info[custompairkey]['add_safety_order_on_profit_percentage']:.4f}%.",
+                    f"{trade.pair}: profit {current_entry_profit_percentage:.4f}% still below threshold of {pairstate.add_safety_order_on_profit_percentage:.4f}%.",
                     "DEBUG"
                 )
                 return None
@@ -743,16 +817,15 @@ class DCAStrategy(BaseStrategy):
 
         # Oke, time to add a Safety Order!
         # Calculate order(s) to be filled. Can be more than one order when there's been a huge drop
-        dca_table = trade.get_custom_data(key='dca_table')
         orderdata = self.determine_required_safety_orders(dca_table, count_of_safety_orders, current_entry_profit_percentage)
 
         volume = orderdata[0]['volume']
         if tso_enabled:
-            trailingstart = self.custom_info[custompairkey]['trailing_start_datetime']
+            trailingstart = pairstate.trailing_start_datetime
             self.log(
-                f"{trade.pair}: bounced from {self.custom_info[custompairkey]['last_profit_percentage']:.4f}% and "
+                f"{trade.pair}: bounced from {pairstate.last_profit_percentage:.4f}% and "
                 f"current profit {current_entry_profit_percentage:.4f}% reached SO {count_of_entries}/{max_orders} "
-                f"at {self.custom_info[custompairkey]['add_safety_order_on_profit_percentage']:.4f}% "
+                f"at {pairstate.add_safety_order_on_profit_percentage:.4f}% "
                 f"(trailing from {next_safety_order_percentage:.4f}% at {trailingstart.strftime('%Y-%m-%d %H:%M:%S')}). "
                 f"Calculated volume of {volume:.{rounddigits}f} for order 1/{len(orderdata)}.",
                 notify=True
@@ -766,18 +839,77 @@ class DCAStrategy(BaseStrategy):
             )
 
         # Reset data and trailing
-        self.custom_info[custompairkey]['last_profit_percentage'] = 0.0
-        self.custom_info[custompairkey]['next_safety_order_profit_percentage'] = 0.0
-        self.custom_info[custompairkey]['add_safety_order_on_profit_percentage'] = 0.0
-        self.custom_info[custompairkey]['trailing_start_datetime'] = datetime.min
+        pairstate.reset_trailing()
+        pairstate.next_safety_order_profit_percentage = 0.0
 
         # Store order data. Keep in mind orders can run into a timeout, and need to be placed again
-        self.custom_info[custompairkey]['open_safety_orders'] = orderdata
+        pairstate.open_safety_orders = orderdata
+        self.journal_pair_state(pairstate)
+        self.custom_info['safety-order-triggers'].pop(trade.id, None)
 
         # Return volume for entry order
         return volume, f"Safety Order {count_of_entries}"
 
 
+    def update_safety_order_trigger(self, trade: Trade, pair_state: DCAPairState, pair_config: DCAPairConfig):
+        """
+        Calculate the rate on which the next Safety Order (or trailing) of the trade could trigger,
+        when not calculated yet. Rates on the safe side of it don't need to be checked further.
+
+        :param trade: Trade to calculate the rate for
+        :param pair_state: Run-time state of the pair and side of the trade
+        :param pair_config: Configuration of the pair and side of the trade
+        """
+
+        if trade.id in self.custom_info['safety-order-triggers']:
+            return
+
+        threshold = pair_state.next_safety_order_profit_percentage
+
+        # Without active trailing, nothing happens until the profit reaches the start of trailing. The
+        # first trailing level applies above that profit (an infinite profit always selects it)
+        if pair_state.last_profit_percentage == 0.0:
+            tso_enabled, tso_start_percentage, _ = self.get_safety_trailing_level(pair_config.trailing_levels, float('inf'), threshold)
+            if tso_enabled:
+                threshold = min(threshold, threshold - tso_start_percentage)
+
+        triggerrate = self.calculate_trigger_rate(trade, threshold)
+        if triggerrate is not None:
+            self.custom_info['safety-order-triggers'][trade.id] = triggerrate
+
+            self.log(
+                "%s: next Safety Order or trailing can trigger from rate %s (profit %.4f%%).",
+                "DEBUG",
+                args=(trade.pair, triggerrate, threshold)
+            )
+
+
+    def calculate_trigger_rate(self, trade: Trade, profit_percentage: float) -> Optional[float]:
+        """
+        Calculate a rate on which the (entry) profit of the trade is at least the given percentage.
+        The rate is estimated from the open rate, and verified (and corrected) with the profit
+        calculation of the trade itself, so any rate beyond it has a higher profit.
+
+        :param trade: Trade to calculate the rate for
+        :param profit_percentage: Profit percentage (without leverage)
+        :return float: Rate, or None when it could not be determined
+        """
+
+        direction = -1.0 if trade.is_short else 1.0
+        target = (profit_percentage / 100.0) * trade.leverage
+
+        rate = trade.open_rate * (1.0 + (direction * profit_percentage / 100.0))
+        for _ in range(10):
+            ratio = trade.calc_profit_ratio(rate)
+            if ratio >= target:
+                return rate
+
+            # Move the rate by the missing profit (plus a tiny bit to end on the right side)
+            rate += direction * trade.open_rate * (((target - ratio) / trade.leverage) + 1e-9)
+
+        return None
+
+
     def handle_trade_safety(self):
         """
         """
@@ -795,6 +927,10 @@ class DCAStrategy(BaseStrategy):
 
         # We don't clear the safety order configuration to allow changing a single value
 
+        # DCA tables build from the previous configuration, and the resolved configuration per pair, are no longer valid
+        self.dca_table_templates.clear()
+        self.pair_configs.clear()
+
         for pk, pv in safety_config.items():
             if not ('_long' in pk or '_short' in pk) and pk != 'default':
                 self.log(f"Invalid safety order configuration key '{pk}'!", 'WARNING', False)
@@ -836,6 +972,8 @@ class DCAStrategy(BaseStrategy):
                     else:
                         self.log(f"Unknown trailing order configuration key '{k}' for pair '{pk}' on index '{index}'!", 'WARNING', False)
 
+        self.compile_trailing_levels()
+
 
     def load_profit_config(self, profit_config: dict) -> None:
         """
@@ -870,6 +1008,41 @@ class DCAStrategy(BaseStrategy):
                     else:
                         self.log(f"Unknown profit configuration key '{k}' for pair '{pk}' on index '{index}'!", 'WARNING', False)
 
+        self.compile_profit_levels()
+
+
+    def compile_trailing_levels(self) -> None:
+        """
+        Compile the levels of the trailing configuration, used by `get_safety_trailing_config`.
+        Call again after changing `trailing_safety_order_configuration`.
+        """
+
+        self.trailing_levels = compile_level_tables(
+            self.trailing_safety_order_configuration,
+            'start_percentage',
+            ('start_percentage', 'factor')
+        )
+
+        # The resolved configuration per pair refers to the previous levels
+        self.pair_configs.clear()
+
+
+    def compile_profit_levels(self) -> None:
+        """
+        Compile the levels of the profit configuration, used by `get_stoploss_config` and `get_profit_config`.
+        Call again after changing `profit_configuration`.
+        """
+
+        self.profit_levels = compile_level_tables(
+            self.profit_configuration,
+            'activation-percentage',
+            ('activation-percentage', 'stoploss-initial', 'stoploss-increment-factor',
+             'min-order-threshold-stoploss', 'profit-increment-factor')
+        )
+
+        # The resolved configuration per pair refers to the previous levels
+        self.pair_configs.clear()
+
 
     def get_safety_trailing_config(self, profit_percentage, safety_order_percentage, config_pair_key) -> tuple[bool, float, float]:
         """
@@ -882,46 +1055,60 @@ class DCAStrategy(BaseStrategy):
                                             and the factor to increase the lacking threshold with
         """
 
-        use_trailing = False
-        start_percentage = 0.0
-        factor = 0.0
+        # Check which levels to use; pair or default
+        return self.get_safety_trailing_level(
+            get_level_table(self.trailing_levels, config_pair_key), profit_percentage, safety_order_percentage
+        )
 
-        # Check which key to use; pair or default. If neither is present, assume the user doesn't
-        # want to use Trailing Safety Order
-        key = ""
-        if config_pair_key in self.trailing_safety_order_configuration:
-            key = config_pair_key
-        elif 'default' in self.trailing_safety_order_configuration:
-            key = 'default'
-        
-        if not key:
-            return use_trailing, start_percentage, factor
-        else:
-            use_trailing = True
 
-        # Find percentage and factor to use based on current (negative) profit. Always look one level
-        # further to make sure the previous one is the right one to use
-        start_percentage = self.trailing_safety_order_configuration[key][0]['start_percentage']
-        factor = self.trailing_safety_order_configuration[key][0]['factor']
+    def get_safety_trailing_level(self, levels, profit_percentage, safety_order_percentage) -> tuple[bool, float, float]:
+        """
+        Get the trailing values from the trailing levels of the pair based on the profit
+
+        :param levels: Trailing levels (LevelTable) of the pair, or None when not configured.
+        :param profit_percentage: Current profit percentage.
+        :param safety_order_percentage: Percentage on which the next Safety Order is configured.
+        :return tuple[bool, float, float]: If trailing is enabled, the percentage trailing should start on 
+                                            and the factor to increase the lacking threshold with
+        """
 
-        for l in self.trailing_safety_order_configuration[key].values():
-            if profit_percentage > (safety_order_percentage - l['start_percentage']):
-                break
+        # If there are no levels, assume the user doesn't want to use Trailing Safety Order
+        if levels is None:
+            return False, 0.0, 0.0
 
-            start_percentage = l['start_percentage']
-            factor = l['factor']
+        # Find percentage and factor to use based on current (negative) profit. Always look one level
+        # further to make sure the previous one is the right one to use; the first level is used when
+        # already the first level is too far
+        walked = levels.count_until(lambda start: profit_percentage > (safety_order_percentage - start))
+        start_percentage, factor = levels[max(walked - 1, 0)]
 
-        return use_trailing, start_percentage, factor
+        return True, start_percentage, factor
 
 
-    def get_stoploss_config(self, current_profit_percentage, config_pair_key) -> tuple[bool, float, float, float]:
+    def get_stoploss_config(self, current_profit_percentage, config_pair_key) -> tuple[bool, float, float, float, int]:
         """
         Get the stoploss values for the current config based on the pair and profit
 
         :param current_profit_percentage: The current profit percentage.
         :param config_pair_key: Key to use for looking up data in the configuration.
-        :return tuple[bool, float, float, float]: If stoploss is enabled, the activation percentage, the initial stoploss 
-                                            percentage and the factor to increase the stoploss with based on the current profit
+        :return tuple[bool, float, float, float, int]: If stoploss is enabled, the activation percentage, the initial stoploss 
+                                            percentage, the factor to increase the stoploss with based on the current profit
+                                            and the minimum number of filled orders
+        """
+
+        # Check which levels to use; pair or default
+        return self.get_stoploss_level(get_level_table(self.profit_levels, config_pair_key), current_profit_percentage)
+
+
+    def get_stoploss_level(self, levels, current_profit_percentage) -> tuple[bool, float, float, float, int]:
+        """
+        Get the stoploss values from the profit levels of the pair based on the profit
+
+        :param levels: Profit levels (LevelTable) of the pair, or None when not configured.
+        :param current_profit_percentage: The current profit percentage.
+        :return tuple[bool, float, float, float, int]: If stoploss is enabled, the activation percentage, the initial stoploss 
+                                            percentage, the factor to increase the stoploss with based on the current profit
+                                            and the minimum number of filled orders
         """
 
         activation_percentage = 0.0
@@ -929,27 +1116,16 @@ class DCAStrategy(BaseStrategy):
         factor = 0.0
         order_threshold = 0
 
-        # Check which key to use; pair or default. If neither is present, assume the user doesn't
-        # want to use Trailing Safety Order
-        key = ""
-        if config_pair_key in self.profit_configuration:
-            key = config_pair_key
-        elif 'default' in self.profit_configuration:
-            key = 'default'
-        
-        if not key:
-            return False, activation_percentage, initial_stoploss, factor
+        # If there are no levels, assume the user doesn't want to use a stoploss
+        if levels is None:
+            return False, activation_percentage, initial_stoploss, factor, order_threshold
 
         # Find percentage and factor to use based on current (positive) profit. Always look one level
-        # further to make sure the previous one is the right one to use
-        for l in self.profit_configuration[key].values():
-            if l['activation-percentage'] > current_profit_percentage:
-                break
-
-            activation_percentage = l['activation-percentage']
-            initial_stoploss = l['stoploss-initial']
-            factor = l['stoploss-increment-factor']
-            order_threshold = l['min-order-threshold-stoploss']
+        # further to make sure the previous one is the right one to use; nothing applies when the
+        # profit is below the first level
+        walked = levels.count_not_above(current_profit_percentage)
+        if walked > 0:
+            activation_percentage, initial_stoploss, factor, order_threshold, _ = levels[walked - 1]
 
         return (initial_stoploss > 0.0), activation_percentage, initial_stoploss, factor, order_threshold
 
@@ -965,35 +1141,19 @@ class DCAStrategy(BaseStrategy):
                                             and the factor to increase the lacking threshold with
         """
 
-        use_trailing = False
-        factor = 0.0
-
-        # Check which key to use; pair or default. If neither is present, assume the user doesn't
+        # Check which levels to use; pair or default. If neither is present, assume the user doesn't
         # want to use Trailing Safety Order
-        key = ""
-        if config_pair_key in self.profit_configuration:
-            key = config_pair_key
-        elif 'default' in self.profit_configuration:
-            key = 'default'
-        
-        if not key:
-            return use_trailing, profit_percentage, factor
-        else:
-            use_trailing = True
+        levels = get_level_table(self.profit_levels, config_pair_key)
+        if levels is None:
+            return False, profit_percentage, 0.0
 
         # Find percentage and factor to use based on current (positive) profit. Always look one level
-        # further to make sure the previous one is the right one to use
-        activation_percentage = self.profit_configuration[key][0]['activation_percentage']
-        factor = self.profit_configuration[key][0]['factor']
+        # further to make sure the previous one is the right one to use; the first level is used when
+        # the profit is below the first level
+        walked = levels.count_not_above(current_profit_percentage)
+        activation_percentage, _, _, _, factor = levels[max(walked - 1, 0)]
 
-        for l in self.profit_configuration[key].values():
-            if l['activation_percentage'] > current_profit_percentage:
-                break
-
-            activation_percentage = l['activation_percentage']
-            factor = l['factor']
-
-        return use_trailing, activation_percentage, factor
+        return True, activation_percentage, factor
 
 
     def calculate_dca_volume(self, safety_order, config_pair_key, max_safety_orders) -> float:
@@ -1121,78 +1281,116 @@ class DCAStrategy(BaseStrategy):
 
         max_safety_orders = len(dca_table)
         if 0 <= current_safety_order <= max_safety_orders:
+            if not isinstance(dca_table, DCALadder):
+                dca_table = DCALadder.from_table(dca_table)
 
-            self.log(
-                f"Determing order list starting from {current_safety_order} till max {max_safety_orders}..."
-            )
+            # Orders reached by the current price deviation, found by bisection of the total deviations
+            count = dca_table.count_crossed(current_safety_order, current_price_deviation)
 
-            so_count = current_safety_order + 1
-            while (so_count <= max_safety_orders):
-                # Break when the Safety Order is not reached yet
-                idx = so_count - 1
-                if current_price_deviation > dca_table[idx]['total_deviation_current']:
-                    self.log(
-                        f"Current_price_deviation {current_price_deviation} > {dca_table[idx]['total_deviation_current']}. Stop adding orders."
-                    )
-                    break
+            # Only one order when Safety Orders may not be merged
+            if self.safety_order_mode != 'merge':
+                count = min(count, 1)
 
-                order = {
-                    'order': so_count,
-                    'deviation': dca_table[idx]['deviation_current'],
+            for idx in range(current_safety_order, current_safety_order + count):
+                requiredorders.append({
+                    'order': idx + 1,
+                    'deviation': dca_table.deviation_current(idx),
                     'current_deviation': current_price_deviation,
-                    'total_deviation': dca_table[idx]['total_deviation_current'],
-                    'volume': dca_table[idx]['volume'] #self.calculate_dca_volume(so_count, config_pair_key, max_safety_orders)
-                }
-                requiredorders.append(order)
+                    'total_deviation': dca_table.total_deviation_current(idx),
+                    'volume': dca_table.volume[idx]
+                })
 
-                self.log(
-                    f"Added order {order} to list of Safety Orders to buy."
-                )
+            self.log(
+                "Determined %d Safety Order(s) to buy for current price deviation %s, starting from order %d till max %d: %s.",
+                args=(len(requiredorders), current_price_deviation, current_safety_order, max_safety_orders, requiredorders)
+            )
 
-                # Break if Safety Orders may not be merged
-                if self.safety_order_mode != 'merge':
-                    break;
+        return requiredorders
 
-                so_count += 1
 
-        return requiredorders
+    def create_pair_state(self, pair: str, side: str) -> DCAPairState:
+        """
+        Create the run-time state of a pair and side, with the required DCA fields.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :return DCAPairState: The initial state
+        """
 
+        return DCAPairState(pair, side)
 
-    def initialize_custom_data(self, custom_pair_key):
+
+    def initialize_pair_state(self, pair: str, side: str, restore: bool = False) -> DCAPairState:
         """
-        Initialize the custom data with the required DCA fields.
+        Initialize the run-time state of a pair and side for a new trade. An existing state
+        (of a previous trade) is reset in place. When restoring, the state stored in the journal
+        before the restart is applied before the state is journaled.
 
-        :param custom_pair_key: The key to create the data for.
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :param restore: Restore the state of the open trade from the journal
+        :return DCAPairState: The state
         """
 
-        super().create_custom_data(custom_pair_key)
+        pairstate = self.pair_states.get(pair, side)
+        if pairstate is None:
+            pairstate = self.pair_states.create(pair, side)
+
+            self.log(f"Created run-time state for pair {self.get_custom_pairkey(pair, side)}.")
+        else:
+            pairstate.reset()
+
+        if restore and self.restore_pair_state(pairstate):
+            # The next Safety Order is calculated again from the (possibly patched) DCA table
+            pairstate.next_safety_order_profit_percentage = 0.0
+
+        self.journal_pair_state(pairstate)
 
-        # Insert default data
-        self.custom_info[custom_pair_key]['last_profit_percentage'] = float(0.0) # Keep track of profit percentage for every cycle/update
-        self.custom_info[custom_pair_key]['next_safety_order_profit_percentage'] = float(0.0) # Percentage on which the next SO is configured
-        self.custom_info[custom_pair_key]['add_safety_order_on_profit_percentage'] = float(0.0) # Percentage on which the next SO should be bought, based on trailing
-        self.custom_info[custom_pair_key]['trailing_start_datetime'] = datetime.min # Datetime trailing started
-        self.custom_info[custom_pair_key]['open_safety_orders'] = list() # List of open Safety Orders to buy
+        return pairstate
 
 
     def get_pairkeys(self, pair: str, side: str, config_type: str) -> tuple[str, str]:
         """
-        Get the custom pairkey used for runtime storage of trade data.
+        Get the custom pairkey of the pair, and the key to use for the configuration.
 
         :param pair: Trading pair
         :param side: Direction of the trade (long/short)
         :param config_type: 'Safety' or 'Profit'
-        :return tuple[str, str]: key for custom data storage, and key for configuration data
+        :return tuple[str, str]: custom pairkey, and key for configuration data
+        """
+
+        pairconfig = self.pair_configs.get(pair, side)
+
+        configpairkey = pairconfig.pairkey
+        if config_type == 'Safety':
+            configpairkey = pairconfig.safety_key
+        elif config_type == 'Profit':
+            configpairkey = pairconfig.profit_key
+
+        return pairconfig.pairkey, configpairkey
+
+
+    def create_pair_config(self, pair: str, side: str, config_class=DCAPairConfig) -> DCAPairConfig:
+        """
+        Resolve the configuration of a pair and side, with the keys of the Safety Order and profit
+        configuration and the trailing and profit levels to use.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :param config_class: Class of the configuration to create
+        :return DCAPairConfig: The resolved configuration
         """
 
-        custompairkey = super().get_custom_pairkey(pair, side)
-        configpairkey = custompairkey
-        if config_type == 'Safety' and not configpairkey in self.safety_order_configuration:
-            configpairkey = 'default'
-        elif config_type == 'Profit' and not configpairkey in self.profit_configuration:
-            configpairkey = 'default'
+        config = super().create_pair_config(pair, side, config_class)
 
-        return custompairkey, configpairkey
+        config.safety_key = resolve_config_key(config.pairkey, self.safety_order_configuration)
+        config.profit_key = resolve_config_key(config.pairkey, self.profit_configuration)
+
+        # Trailing is looked up with the key of the Safety Order configuration
+        config.trailing_levels = get_level_table(self.trailing_levels, config.safety_key)
+        config.profit_levels = get_level_table(self.profit_levels, config.profit_key)
+
+        return config
 
 
     def get_boso_factor(self) -> float:
@@ -1214,23 +1412,59 @@ class DCAStrategy(BaseStrategy):
         :return list: list of Safety Orders
         """
 
-        table = list()
+        # The template is bound to the resolved configuration of the pair on first use
+        pairconfig = self.pair_configs.get(pair, self.trading_direction)
+        if pairconfig.dca_table_template is None:
+            pairconfig.dca_table_template = self.get_dca_table_template(pairconfig.safety_key)
 
-        _, configpairkey = self.get_pairkeys(pair, self.trading_direction, 'Safety')
+        # Return a copy, because the table of a trade is changed when orders are shifted
+        return [order.copy() for order in pairconfig.dca_table_template]
+
+
+    def get_dca_table_template(self, config_pair_key: str) -> list:
+        """
+        Get the DCA table to copy for new trades of a Safety Order configuration. Tables built
+        from the configured settings are shared by all pairs using the same configuration.
+
+        :param config_pair_key: Key to use for looking up data in the configuration.
+        :return list: list of Safety Orders; do not modify
+        """
 
         # If there is a preconfigured dca_table, use that one.
-        if "dca_table" in self.safety_order_configuration[configpairkey]:
-            return self.safety_order_configuration[configpairkey]["dca_table"].copy()
+        if "dca_table" in self.safety_order_configuration[config_pair_key]:
+            return self.safety_order_configuration[config_pair_key]["dca_table"]
+
+        # There is no preconfigured dca_table, so build one based on the configured settings (once)
+        templatekey = (config_pair_key, self.stake_amount, self.trade_bo_so_ratio)
+        template = self.dca_table_templates.get(templatekey)
+        if template is None:
+            template = self.build_dca_table(config_pair_key)
+            self.dca_table_templates[templatekey] = template
+
+        return template
+
+
+    def build_dca_table(self, config_pair_key: str) -> list:
+        """
+        Build the DCA table for the configured settings in one pass. The deviation and volume of
+        each order follow a geometric series; the totals are accumulated while building.
+
+        :param config_pair_key: Key to use for looking up data in the configuration.
+        :return list: list of Safety Orders
+        """
+
+        table = list()
 
-        # There is no preconfigured dca_table, so build one based on the configured settings
-        so_count = 1
-        max_so = self.safety_order_configuration[configpairkey]['max_so']
+        config = self.safety_order_configuration[config_pair_key]
+        max_so = config['max_so']
+
+        total_deviation = 0.0
         total_volume = self.stake_amount
-        while(so_count <= max_so):
-            deviation = self.calculate_dca_step_deviation(so_count, configpairkey, max_so)
-            total_deviation = self.calculate_dca_deviation_total(so_count, configpairkey, max_so)
+        for so_count in range(1, max_so + 1):
+            deviation = -(config['price_deviation'] * (pow(config['step_scale'], (so_count - 1))))
+            total_deviation += deviation
 
-            volume = self.calculate_dca_volume(so_count, configpairkey, max_so)
+            volume = config['initial_so_amount'] * (pow(config['volume_scale'], (so_count - 1)))
             total_volume += volume
 
             order = {
@@ -1244,22 +1478,73 @@ class DCAStrategy(BaseStrategy):
             }
             table.append(order)
 
-            so_count += 1
-
         return table
 
 
+    def get_dca_table(self, trade: Trade) -> DCALadder:
+        """
+        Get the DCA table of the trade. The table is read from the custom data of the trade
+        once, and kept in memory afterwards. Tables are stored compact or as list of dicts.
+
+        :param trade: Trade to get the DCA table for
+        :return DCALadder: Safety Orders (indexable as list of dicts), or None when no table is stored
+        """
+
+        cached = self.custom_info['dca-tables'].get(trade.id)
+        if cached is None:
+            stored = trade.get_custom_data(key='dca_table')
+            if stored is None:
+                return None
+
+            cached = {'table': decode_dca_table(stored), 'stored': stored}
+            self.custom_info['dca-tables'][trade.id] = cached
+
+        return cached['table']
+
+
+    def store_dca_table(self, trade: Trade, dca_table):
+        """
+        Store the DCA table with the trade, and keep it in memory. The custom data of the
+        trade is only written when the table changed.
+
+        :param trade: Trade to store the DCA table for
+        :param dca_table: Safety Orders, as DCALadder or list of dicts
+        """
+
+        if not isinstance(dca_table, DCALadder):
+            dca_table = DCALadder.from_table(dca_table)
+
+        if self.compact_dca_table:
+            stored = encode_dca_table(dca_table)
+        else:
+            stored = [dict(order) for order in dca_table]
+
+        cached = self.custom_info['dca-tables'].get(trade.id)
+        self.custom_info['dca-tables'][trade.id] = {'table': dca_table, 'stored': stored}
+
+        if cached is not None and cached['stored'] == stored:
+            return
+
+        trade.set_custom_data(key='dca_table', value=stored)
+
+
     def shift_dca_table(self, dca_table: list, start_from_order: int, shift_percentage: float, only_total = False):
         """
         Shift the values in the DCA table by the given percentage from a certain order
         Will shift the deviation for the current order number to account for the shift, and 
         the total deviation for all the orders after that one.
 
+        A DCALadder only registers the shift, which is resolved when the orders are accessed.
+
         :param dca_table: DCA table to shift
         :param start_from_order: Order number to start shifting from
         :param shift_percentage: Percentage to shift
         """
 
+        if isinstance(dca_table, DCALadder):
+            dca_table.shift(start_from_order, shift_percentage, only_total)
+            return
+
         for safetyorder in dca_table:
             # Skip previous orders
             if safetyorder['order'] < start_from_order:
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark for the indicators package.
+
+Times `supertrend()` on deterministic synthetic candles for every source and both
+ATR calculations, and records throughput (candles per second) and peak memory.
+Results can be stored as baseline, and later runs fail (exit code 1) when they
+regress beyond the threshold compared to that baseline.
+
+Run from the root of the repository:
+    python -m indicators.benchmark --save-baseline
+    python -m indicators.benchmark --threshold 0.20
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame, date_range
+
+from indicators.supertrend import supertrend
+
+SOURCES = ("hl2", "open", "high", "low", "close")
+ATR_MODES = (False, True)
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+
+
+def generate_ohlcv(size, seed=42):
+    """Generate deterministic synthetic 5m candles (random walk)."""
+
+    rng = np.random.default_rng(seed)
+
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, size)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1.0 + np.abs(rng.normal(0.0, 0.001, size)))
+    low = np.minimum(open_, close) * (1.0 - np.abs(rng.normal(0.0, 0.001, size)))
+    volume = rng.uniform(1.0, 100.0, size)
+
+    return DataFrame({
+        "date": date_range("2020-01-01", periods=size, freq="5min", tz="UTC"),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    })
+
+
+def run_case(df, source, change_atr, repeat, length=10, multiplier=3.0):
+    """Time one case; best time out of repeat runs, peak memory of a separate run."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        supertrend(df["open"], df["high"], df["low"], df["close"], length, multiplier, source, change_atr)
+        best = min(best, time.perf_counter() - start)
+
+    # Measure memory separately, as tracing slows down the calculation
+    tracemalloc.start()
+    supertrend(df["open"], df["high"], df["low"], df["close"], length, multiplier, source, change_atr)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": best,
+        "candles_per_second": len(df) / best if best > 0 else 0.0,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmark(sizes, repeat):
+    """Run all cases and return the results keyed by case name."""
+
+    results = {}
+    for size in sizes:
+        df = generate_ohlcv(size)
+        for source in SOURCES:
+            for change_atr in ATR_MODES:
+                name = f"supertrend/{size}/{source}/{'atr' if change_atr else 'sma'}"
+                results[name] = run_case(df, source, change_atr, repeat if size < 1_000_000 else 1)
+
+                print(
+                    f"{name:<40} {results[name]['candles_per_second']:>14,.0f} candles/s "
+                    f"{results[name]['peak_memory_bytes'] / 1024 / 1024:>10.2f} MiB"
+                )
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions compared to the baseline."""
+
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        base = baseline[name]
+        if result["candles_per_second"] < base["candles_per_second"] * (1.0 - threshold):
+            regressions.append(
+                f"{name}: throughput {result['candles_per_second']:,.0f} candles/s "
+                f"is below baseline {base['candles_per_second']:,.0f} candles/s"
+            )
+        if result["peak_memory_bytes"] > base["peak_memory_bytes"] * (1.0 + threshold):
+            regressions.append(
+                f"{name}: peak memory {result['peak_memory_bytes']:,} bytes "
+                f"is above baseline {base['peak_memory_bytes']:,} bytes"
+            )
+
+    return regressions
+
+
+def main():
+    """Parse options, run the benchmark and compare with or store the baseline."""
+
+    parser = argparse.ArgumentParser(description="Cyberjunky's indicators benchmark.")
+    parser.add_argument(
+        "-s", "--sizes", help="comma separated number of candles per run", type=str,
+        default=",".join(str(size) for size in DEFAULT_SIZES)
+    )
+    parser.add_argument("-r", "--repeat", help="number of runs per case (best is used)", type=int, default=3)
+    parser.add_argument("-b", "--baseline", help="baseline file to compare with", type=str, default=str(DEFAULT_BASELINE))
+    parser.add_argument("-t", "--threshold", help="allowed regression as ratio (0.20 = 20%%)", type=float, default=0.20)
+    parser.add_argument("--save-baseline", help="store the results as new baseline", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run_benchmark(sizes, max(1, args.repeat))
+
+    baselinefile = Path(args.baseline)
+    if args.save_baseline:
+        with open(baselinefile, "w") as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+        print(f"Stored baseline in '{baselinefile}'")
+        return 0
+
+    if not baselinefile.exists():
+        print(f"No baseline file '{baselinefile}' found; run with --save-baseline first")
+        return 0
+
+    with open(baselinefile, "r") as file:
+        baseline = json.load(file)
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if regressions:
+        return 1
+
+    print(f"No regressions beyond {args.threshold:.0%} compared to '{baselinefile}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
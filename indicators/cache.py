@@ -0,0 +1,194 @@
+from collections import OrderedDict
+
+from pandas import DataFrame
+from pandas_ta import Imports
+from pandas_ta.overlap import hl2, rma, sma
+from pandas_ta.volatility import atr, true_range
+
+### Memoization of the basic series used by volatility based indicators (true range,
+##  ATR, SMA of the true range and HL2). Indicators calculated on the same candles
+##  share the results instead of calculating them again.
+##  Entries are keyed by (pair, timeframe, name, length, last candle date, row count).
+##  When a new candle arrives for a pair and timeframe, the entries of the previous
+##  candles are dropped. The cached Series must be treated as read-only.
+##  The cache is bounded by the bytes of the cached series (`nbytes`); the least recently
+##  used entries are evicted first.
+
+
+def atr_of_true_range(tr, high, low, close, length: int):
+    """
+    ATR of a true range calculated before, so the true range is shared by all lengths. The
+    result is the same as `atr(high, low, close, length)` of pandas-ta; the RMA of the true
+    range. When pandas-ta uses TA-Lib for the ATR, TA-Lib calculates it (and the true range)
+    instead, so the results stay the same.
+
+    :param tr: True range of the candles
+    :param high: Series of 'high's
+    :param low: Series of 'low's
+    :param close: Series of 'close's
+    :param length: Length of the ATR
+    :return Series: The ATR
+    """
+
+    if Imports['talib']:
+        return atr(high, low, close, length)
+
+    return rma(tr, length)
+
+
+class IndicatorCache:
+    """
+    Bounded (LRU) memo cache for indicator series, with hit/miss counters.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        """
+        :param max_bytes: Maximum number of bytes used by all cached series together
+        """
+
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._frames = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+    def frame(self, pair: str, timeframe: str, dataframe: DataFrame) -> 'FrameCache':
+        """
+        Get the cache for the current candles of a pair and timeframe. Entries of
+        older candles of the same pair and timeframe are dropped.
+
+        :param pair: Pair the dataframe belongs to
+        :param timeframe: Timeframe the dataframe belongs to
+        :param dataframe: Dataframe with the candles
+        :return FrameCache: Cache bound to these candles
+        """
+
+        rows = len(dataframe)
+        last_date = None
+        if rows > 0:
+            last_date = dataframe['date'].iat[-1] if 'date' in dataframe.columns else dataframe.index[-1]
+
+        key = (pair, timeframe, last_date, rows)
+
+        previous = self._frames.get((pair, timeframe))
+        if previous is not None and previous != key:
+            self.invalidate(pair, timeframe)
+        self._frames[(pair, timeframe)] = key
+
+        return FrameCache(self, key)
+
+
+    def invalidate(self, pair: str, timeframe: str) -> None:
+        """
+        Drop all entries for a pair and timeframe.
+
+        :param pair: Pair to drop the entries for
+        :param timeframe: Timeframe to drop the entries for
+        """
+
+        outdatedkeys = [k for k in self._entries if k[0] == pair and k[1] == timeframe]
+        for k in outdatedkeys:
+            self._bytes -= self._entries.pop(k)[1]
+
+        self.invalidations += len(outdatedkeys)
+        self._frames.pop((pair, timeframe), None)
+
+
+    def get(self, frame_key: tuple, name: str, length: int, compute):
+        """
+        Get a series from the cache, or compute and store it when not present.
+
+        :param frame_key: Key of the candles, as created by `frame()`
+        :param name: Name of the series
+        :param length: Length used for the series (0 when not applicable)
+        :param compute: Function without arguments computing the series
+        :return: The (cached) series
+        """
+
+        pair, timeframe, last_date, rows = frame_key
+        key = (pair, timeframe, name, length, last_date, rows)
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        self.misses += 1
+
+        value = compute()
+        size = int(getattr(value, 'nbytes', 0))
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+        # The most recent entry is never evicted, even when it exceeds the budget on its own
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._bytes -= self._entries.popitem(last=False)[1][1]
+            self.evictions += 1
+
+        return value
+
+
+    def clear(self) -> None:
+        """
+        Drop all entries. Counters are kept.
+        """
+
+        self._entries.clear()
+        self._frames.clear()
+        self._bytes = 0
+
+
+    def stats(self) -> dict:
+        """
+        Get the cache statistics, for logging purposes.
+
+        :return dict: Number of entries, bytes used, hits, misses, evictions, invalidations and hit ratio
+        """
+
+        lookups = self.hits + self.misses
+
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class FrameCache:
+    """
+    Cache bound to the candles of a single pair and timeframe. Passed to indicators
+    with the `cache` argument.
+    """
+
+    __slots__ = ('cache', 'key')
+
+    def __init__(self, cache: IndicatorCache, key: tuple):
+        self.cache = cache
+        self.key = key
+
+
+    def true_range(self, high, low, close):
+        return self.cache.get(self.key, 'true_range', 0, lambda: true_range(high, low, close))
+
+
+    def atr(self, high, low, close, length: int):
+        return self.cache.get(self.key, 'atr', length, lambda: atr_of_true_range(self.true_range(high, low, close), high, low, close, length))
+
+
+    def sma_true_range(self, high, low, close, length: int):
+        return self.cache.get(self.key, 'sma_true_range', length, lambda: sma(self.true_range(high, low, close), length))
+
+
+    def hl2(self, high, low):
+        return self.cache.get(self.key, 'hl2', 0, lambda: hl2(high, low))
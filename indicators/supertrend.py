@@ -1,9 +1,17 @@
+from collections import deque
+from itertools import product
+from math import isnan
+from typing import NamedTuple
+
+import numpy as np
 from numpy import nan as npNaN
 from pandas import DataFrame
 from pandas_ta.overlap import hl2, sma
 from pandas_ta.volatility import atr, true_range
 from pandas_ta.utils import get_offset, verify_series
 
+from indicators.cache import atr_of_true_range
+
 ### This supertrend indicator is a copy of pandas-ta. The functionality is the same, 
 ##  however the pandas version is not offering the option to pass the series on
 ##  which the upper- and lowerband are calculated. It defaults to HL2 which is most
@@ -13,8 +21,15 @@ from pandas_ta.utils import get_offset, verify_series
 ##  - source argument added (defaults to hl2)
 ##  - renamed `hl2_` to `middleband_value`
 ##  - add match case (switch case in Python, supported from 3.10)
+##  - the per candle loop runs on plain NumPy buffers (see `supertrend_kernel`)
+##    instead of pandas scalar indexing with `.iloc`
+##  - output argument added; 'arrays' returns typed arrays instead of a DataFrame
+##  - target argument added to write the results straight into dataframe columns
+##  - cache argument added to share true range, ATR, SMA and HL2 (see `indicators.cache`)
 
-def supertrend(open, high, low, close, length=None, multiplier=None, source='hl2', change_atr_calculation=False, offset=None, **kwargs):
+def supertrend(open, high, low, close, length=None, multiplier=None, source='hl2', change_atr_calculation=False, offset=None,
+               output='dataframe', band_dtype=np.float64, target=None, columns=('trend', 'direction', 'long', 'short'),
+               cache=None, **kwargs):
     """Supertrend (supertrend)
 
 Supertrend is an overlap indicator. It is used to help identify trend
@@ -60,6 +75,16 @@ Args:
     source (string): source to use for calculation of lower- and 
         upperband. Default: hl2        
     offset (int): How many periods to offset the result. Default: 0
+    output (string): 'dataframe' or 'arrays'. With 'arrays' a SupertrendResult
+        with an int8 direction is returned. Default: dataframe
+    band_dtype (np.dtype): dtype of trend, long and short when output is
+        'arrays' or a target is given. Default: np.float64
+    target (pd.DataFrame): Dataframe to write the results into, using the
+        names in columns. Default: None
+    columns (tuple): Column names for trend, direction, long and short when
+        writing into target. Default: ('trend', 'direction', 'long', 'short')
+    cache (FrameCache): Cache for the candles, from IndicatorCache.frame(),
+        to share the true range, ATR, SMA and HL2. Default: None
 
 Kwargs:
     fillna (value, optional): pd.DataFrame.fillna(value)
@@ -67,6 +92,8 @@ Kwargs:
 
 Returns:
     pd.DataFrame: SUPERT (trend), SUPERTd (direction), SUPERTl (long), SUPERTs (short) columns.
+    SupertrendResult: when output is 'arrays'; offset and fills are not applied.
+    pd.DataFrame: target, when given.
 """
 
     # Validate Arguments
@@ -80,50 +107,38 @@ Returns:
 
     if open is None or high is None or low is None or close is None: return
 
-    # Calculate Results
-    m = close.size
-    dir_, trend = [1] * m, [0] * m
-    long, short = [npNaN] * m, [npNaN] * m
+    # Calculate Results. Use compact types when no intermediate DataFrame is needed
+    compact = output == 'arrays' or target is not None
+    dir_dtype, float_dtype = (np.int8, band_dtype) if compact else (np.int64, np.float64)
 
-    middleband_value = 0.0
+    m = close.size
+    dir_, trend = np.ones(m, dtype=dir_dtype), np.zeros(m, dtype=float_dtype)
+    long, short = np.full(m, npNaN, dtype=float_dtype), np.full(m, npNaN, dtype=float_dtype)
 
-    if source == "open":
-        middleband_value = open
-    elif source == "high":
-        middleband_value = high
-    elif source == "low":
-        middleband_value = low
-    elif source == "close":
-        middleband_value = close
-    else:
-        middleband_value = hl2(high, low)
+    middleband_value = middleband(open, high, low, close, source, cache)
 
     matr = multiplier
-    if change_atr_calculation:
+    if cache is not None:
+        if change_atr_calculation:
+            matr *= cache.atr(high, low, close, length)
+        else:
+            matr *= cache.sma_true_range(high, low, close, length)
+    elif change_atr_calculation:
         matr *= atr(high, low, close, length)
     else:
         matr *= sma(true_range(high, low, close), length)
 
-    upperband = middleband_value + matr
-    lowerband = middleband_value - matr
+    # Take the buffers once from the Series; the kernel only works on NumPy data
+    upperband = (middleband_value + matr).to_numpy(dtype=np.float64, copy=True)
+    lowerband = (middleband_value - matr).to_numpy(dtype=np.float64, copy=True)
 
-    for i in range(1, m):
-        if close.iloc[i] > upperband.iloc[i - 1]:
-            dir_[i] = 1
-        elif close.iloc[i] < lowerband.iloc[i - 1]:
-            dir_[i] = -1
-        else:
-            dir_[i] = dir_[i - 1]
+    supertrend_kernel(close.to_numpy(dtype=np.float64), upperband, lowerband, dir_, trend, long, short)
 
-        if dir_[i] > 0 and lowerband.iloc[i] < lowerband.iloc[i - 1]:
-            lowerband.iloc[i] = lowerband.iloc[i - 1]
-        if dir_[i] < 0 and upperband.iloc[i] > upperband.iloc[i - 1]:
-            upperband.iloc[i] = upperband.iloc[i - 1]
+    if output == 'arrays' and target is None:
+        return SupertrendResult(trend, dir_, long, short)
 
-        if dir_[i] > 0:
-            trend[i] = long[i] = lowerband.iloc[i]
-        else:
-            trend[i] = short[i] = upperband.iloc[i]
+    if target is not None:
+        return write_supertrend(target, SupertrendResult(trend, dir_, long, short), columns, offset, **kwargs)
 
     # Prepare DataFrame to return
     _props = f"_{length}_{multiplier}"
@@ -149,3 +164,572 @@ Returns:
         df.fillna(method=kwargs["fill_method"], inplace=True)
 
     return df
+
+
+
+class SupertrendResult(NamedTuple):
+    """
+    Supertrend values as plain arrays, one element per candle.
+    """
+
+    trend: np.ndarray
+    direction: np.ndarray
+    long: np.ndarray
+    short: np.ndarray
+
+
+def write_supertrend(target: DataFrame, result: SupertrendResult, columns=('trend', 'direction', 'long', 'short'), offset=0, **kwargs) -> DataFrame:
+    """
+    Write Supertrend arrays into columns of a dataframe, without building an
+    intermediate DataFrame.
+
+    :param target: Dataframe to write into; must have one row per element of the arrays
+    :param result: The Supertrend arrays
+    :param columns: Column names for trend, direction, long and short
+    :param offset: How many periods to offset the result
+    :param kwargs: 'fillna' and 'fill_method', like `supertrend()`
+    :return DataFrame: The target dataframe
+    """
+
+    for column, values in zip(columns, result):
+        target[column] = values
+
+        # Apply offset and fills only when requested, as these create new Series
+        if offset != 0:
+            target[column] = target[column].shift(offset)
+        if "fillna" in kwargs:
+            target[column] = target[column].fillna(kwargs["fillna"])
+        if "fill_method" in kwargs:
+            target[column] = target[column].fillna(method=kwargs["fill_method"])
+
+    return target
+
+
+def middleband(open, high, low, close, source='hl2', cache=None):
+    """
+    Select the series on which the upper- and lowerband are calculated.
+
+    :param open: Series of 'open's
+    :param high: Series of 'high's
+    :param low: Series of 'low's
+    :param close: Series of 'close's
+    :param source: 'open', 'high', 'low', 'close' or 'hl2' (default)
+    :param cache: Optional FrameCache to get HL2 from
+    :return: The series to use as middleband
+    """
+
+    if source == "open":
+        return open
+    elif source == "high":
+        return high
+    elif source == "low":
+        return low
+    elif source == "close":
+        return close
+
+    if cache is not None:
+        return cache.hl2(high, low)
+
+    return hl2(high, low)
+
+
+def supertrend_kernel(close, upperband, lowerband, direction, trend, long, short):
+    """
+    Run the Supertrend recursion on plain NumPy buffers.
+
+    All arrays must have the same length. The first element of every array is
+    used as the starting state and is not modified; `direction[0]` should hold
+    the direction of the previous candle (1 when starting from scratch). The
+    upper- and lowerband buffers are updated in place to the final bands, and
+    the direction, trend, long and short buffers are filled from index 1 on.
+
+    Values are read into Python lists once, which is a lot cheaper than scalar
+    indexing on either pandas or NumPy objects inside the loop.
+
+    :param close: Array of close prices
+    :param upperband: Array with the basic upperband, replaced by the final upperband
+    :param lowerband: Array with the basic lowerband, replaced by the final lowerband
+    :param direction: Output array for the direction (1 or -1)
+    :param trend: Output array for the trend
+    :param long: Output array for the long values (NaN when short)
+    :param short: Output array for the short values (NaN when long)
+    """
+
+    m = close.size
+    if m < 2:
+        return
+
+    close_ = close.tolist()
+    upper, lower = upperband.tolist(), lowerband.tolist()
+    dir_, trend_ = direction.tolist(), trend.tolist()
+    long_, short_ = long.tolist(), short.tolist()
+
+    for i in range(1, m):
+        if close_[i] > upper[i - 1]:
+            dir_[i] = 1
+        elif close_[i] < lower[i - 1]:
+            dir_[i] = -1
+        else:
+            dir_[i] = dir_[i - 1]
+
+        if dir_[i] > 0 and lower[i] < lower[i - 1]:
+            lower[i] = lower[i - 1]
+        if dir_[i] < 0 and upper[i] > upper[i - 1]:
+            upper[i] = upper[i - 1]
+
+        if dir_[i] > 0:
+            trend_[i] = long_[i] = lower[i]
+        else:
+            trend_[i] = short_[i] = upper[i]
+
+    upperband[:] = upper
+    lowerband[:] = lower
+    direction[:] = dir_
+    trend[:] = trend_
+    long[:] = long_
+    short[:] = short_
+
+
+class SupertrendBatch(NamedTuple):
+    """
+    Result of `supertrend_batch()`. Every array has one row per candle and one column
+    per (length, multiplier, source) combination, in the order of `combinations`.
+    """
+
+    combinations: list
+    columns: dict
+    trend: np.ndarray
+    direction: np.ndarray
+    long: np.ndarray
+    short: np.ndarray
+
+    def column(self, length: int, multiplier: float, source: str = 'hl2') -> int:
+        """
+        Get the column for a combination of settings.
+
+        :param length: Length for ATR calculation
+        :param multiplier: Coefficient for upper and lower band distance to midrange
+        :param source: Source used for calculation of lower- and upperband
+        :return int: Column index in the result arrays
+        """
+
+        return self.columns[(int(length), float(multiplier), source)]
+
+
+def supertrend_batch(open, high, low, close, lengths, multipliers, sources=('hl2',), change_atr_calculation=False, cache=None) -> SupertrendBatch:
+    """
+    Calculate the Supertrend for every combination of lengths, multipliers and sources
+    in one pass over the candles. The true range is calculated once, the ATR (or SMA)
+    once per length and the middleband once per source. Results per combination are
+    the same as `supertrend()` with the same settings.
+
+    :param open: Series of 'open's
+    :param high: Series of 'high's
+    :param low: Series of 'low's
+    :param close: Series of 'close's
+    :param lengths: Lengths for ATR calculation
+    :param multipliers: Coefficients for upper and lower band distance to midrange
+    :param sources: Sources to use for calculation of lower- and upperband
+    :param change_atr_calculation: Use ATR (True) or SMA of the true range (False)
+    :param cache: Optional FrameCache to share the true range, ATR, SMA and HL2
+    :return SupertrendBatch: Arrays of candles x combinations
+    """
+
+    lengths = [int(length) if length and length > 0 else 7 for length in lengths]
+    multipliers = [float(multiplier) if multiplier and multiplier > 0 else 3.0 for multiplier in multipliers]
+    combinations = list(product(lengths, multipliers, sources))
+
+    m, k = close.size, len(combinations)
+    upperband = np.empty((m, k), dtype=np.float64)
+    lowerband = np.empty((m, k), dtype=np.float64)
+
+    # Shared work; true range once, volatility per length and middleband per source
+    tr = None if cache is not None else true_range(high, low, close)
+    volatility, middlebands = {}, {}
+    for length in lengths:
+        if length not in volatility:
+            if cache is not None:
+                if change_atr_calculation:
+                    volatility[length] = cache.atr(high, low, close, length)
+                else:
+                    volatility[length] = cache.sma_true_range(high, low, close, length)
+            elif change_atr_calculation:
+                volatility[length] = atr_of_true_range(tr, high, low, close, length)
+            else:
+                volatility[length] = sma(tr, length)
+    for source in sources:
+        if source not in middlebands:
+            middlebands[source] = middleband(open, high, low, close, source, cache)
+
+    for idx, (length, multiplier, source) in enumerate(combinations):
+        matr = multiplier * volatility[length]
+        upperband[:, idx] = (middlebands[source] + matr).to_numpy(dtype=np.float64)
+        lowerband[:, idx] = (middlebands[source] - matr).to_numpy(dtype=np.float64)
+
+    direction = np.ones((m, k), dtype=np.int8)
+    closes = close.to_numpy(dtype=np.float64)
+
+    # Same recursion as supertrend_kernel, but on all combinations of a candle at once
+    for i in range(1, m):
+        c = closes[i]
+        upper_prev, lower_prev = upperband[i - 1], lowerband[i - 1]
+        dir_ = np.where(c > upper_prev, 1, np.where(c < lower_prev, -1, direction[i - 1]))
+        direction[i] = dir_
+
+        lower, upper = lowerband[i], upperband[i]
+        np.copyto(lower, lower_prev, where=(dir_ > 0) & (lower < lower_prev))
+        np.copyto(upper, upper_prev, where=(dir_ < 0) & (upper > upper_prev))
+
+    is_long = direction > 0
+    trend = np.where(is_long, lowerband, upperband)
+    long = np.where(is_long, lowerband, npNaN)
+    short = np.where(is_long, npNaN, upperband)
+    if m > 0:
+        trend[0], long[0], short[0] = 0.0, npNaN, npNaN
+
+    columns = {combination: idx for idx, combination in enumerate(combinations)}
+
+    return SupertrendBatch(combinations, columns, trend, direction, long, short)
+
+
+class SupertrendStream:
+    """
+    Stateful Supertrend for one pair, timeframe and parameter set.
+
+    The first call to `update` does a full calculation, exactly like `supertrend()`,
+    and keeps the state required to continue: previous close, ATR value (or the
+    true range window for the SMA mode), final bands and direction. Following calls
+    only calculate the candles appended after the last known candle, so the cost
+    per new candle doesn't depend on the length of the dataframe.
+
+    The results are kept in preallocated buffers which grow by doubling (like
+    `AppendOnlyFrame` of the dataframe cache); candles dropped at the start of the
+    dataframe only move the start of the buffers. Of the history only the date of
+    the last known candle and the number of candles are kept.
+
+    A full recalculation is done when the new dataframe doesn't line up with the
+    stored state: the last known candle is missing or changed, candles are
+    missing (gap) or not in order, or not enough candles were available to
+    warm up the ATR. Because the state is continued, values can differ from a
+    fresh `supertrend()` over the same (shorter) window in the last decimals of
+    the bands when freqtrade drops candles at the start of the dataframe.
+    """
+
+    # Types of the trend, direction, long and short buffers; the direction is compact, like
+    # `supertrend()` writing into a target
+    DTYPES = (np.float64, np.int8, np.float64, np.float64)
+
+    def __init__(self, length: int, multiplier: float, source: str = 'hl2',
+                 change_atr_calculation: bool = False, timeframe_minutes: int = 0):
+        """
+        :param length: Length for ATR calculation
+        :param multiplier: Coefficient for upper and lower band distance to midrange
+        :param source: Source to use for calculation of lower- and upperband
+        :param change_atr_calculation: Use ATR (True) or SMA of the true range (False)
+        :param timeframe_minutes: Candle duration, used to detect gaps. 0 disables the check
+        """
+
+        self.length = int(length) if length and length > 0 else 7
+        self.multiplier = float(multiplier) if multiplier and multiplier > 0 else 3.0
+        self.source = source
+        self.change_atr_calculation = change_atr_calculation
+        self.candle_ns = int(timeframe_minutes) * 60 * 1_000_000_000
+
+        # Number of full and incremental calculations, for logging purposes
+        self.full_updates = 0
+        self.incremental_updates = 0
+        self.last_reason = ""
+
+        self.reset()
+
+
+    def reset(self):
+        """
+        Drop all state, forcing a full calculation on the next update.
+        """
+
+        # Trend, direction, long and short; rows start to end are in use
+        self._buffers = None
+        self._start = 0
+        self._end = 0
+        self._last_date = None
+
+        self._last_ohlc = None
+        self._atr = npNaN
+        self._tr_window = deque(maxlen=self.length)
+        self._upper = npNaN
+        self._lower = npNaN
+
+
+    def update(self, dataframe: DataFrame, target: DataFrame = None, columns=('trend', 'direction', 'long', 'short')) -> DataFrame:
+        """
+        Bring the Supertrend up to date with the given dataframe.
+
+        When the columns are already present in the target, and hold the values of the previous
+        update, only the rows of the new candles are written.
+
+        :param dataframe: Dataframe with 'date', 'open', 'high', 'low' and 'close' columns
+        :param target: Optional dataframe to write the results into (usually the same dataframe)
+        :param columns: Column names for trend, direction, long and short when writing into target
+        :return DataFrame: Same columns as `supertrend()`, aligned on the index of the dataframe,
+                           or the target when given. None when the dataframe has less candles than
+                           the length, like `supertrend()`
+        """
+
+        if len(dataframe) < self.length:
+            self.reset()
+            return None
+
+        dropped, new_from, reason = self._align(dataframe)
+        if reason:
+            self.last_reason = reason
+            self._full(dataframe)
+            self.full_updates += 1
+            new_from = 0
+        else:
+            self._append(dataframe, dropped, new_from)
+            self.incremental_updates += 1
+
+        result = SupertrendResult(*(buffer[self._start:self._end] for buffer in self._buffers))
+
+        if target is not None:
+            return self._write(target, result, columns, new_from)
+
+        _props = f"_{self.length}_{self.multiplier}"
+        df = DataFrame({
+                f"SUPERT{_props}": result.trend.copy(),
+                f"SUPERTd{_props}": result.direction.astype(np.int64),
+                f"SUPERTl{_props}": result.long.copy(),
+                f"SUPERTs{_props}": result.short.copy(),
+            }, index=dataframe.index)
+
+        df.name = f"SUPERT{_props}"
+        df.category = "overlap"
+
+        return df
+
+
+    def _align(self, dataframe: DataFrame) -> tuple[int, int, str]:
+        """
+        Check if the dataframe continues the stored state. Only the candles after the last
+        known candle, and the first candle, are looked at.
+
+        :return tuple[int, int, str]: Number of stored candles dropped at the start of the
+                                      dataframe, position of the first new candle in the dataframe
+                                      and the reason for a full calculation (empty when not required)
+        """
+
+        if self._buffers is None:
+            return 0, 0, "no state"
+
+        if isnan(self._upper) or isnan(self._lower):
+            return 0, 0, "not warmed up"
+
+        # Position of the last known candle in the new data, searched back from the end
+        size = len(dataframe)
+        last_pos = size - 1
+        date = self._date_at(dataframe, last_pos)
+        while last_pos > 0 and date > self._last_date:
+            last_pos -= 1
+            date = self._date_at(dataframe, last_pos)
+        if date != self._last_date:
+            return 0, 0, "last known candle missing"
+
+        # The dataframe may only drop candles at the start; with a known timeframe, the first
+        # candle must be exactly that many candles before the last known candle
+        dropped = (self._end - self._start) - (last_pos + 1)
+        if dropped < 0:
+            return 0, 0, "history changed"
+        if self.candle_ns and self._date_at(dataframe, 0) != self._last_date - last_pos * self.candle_ns:
+            return 0, 0, "history changed"
+
+        if self._ohlc_at(dataframe, last_pos) != self._last_ohlc:
+            return 0, 0, "last known candle changed"
+
+        # New candles must follow each other without gaps
+        if last_pos < size - 1:
+            steps = np.diff([self._date_at(dataframe, pos) for pos in range(last_pos, size)])
+            if (steps <= 0).any():
+                return 0, 0, "candles not in order"
+            if self.candle_ns and (steps != self.candle_ns).any():
+                return 0, 0, "gap in candles"
+
+        return dropped, last_pos + 1, ""
+
+
+    @staticmethod
+    def _date_at(dataframe: DataFrame, pos: int) -> int:
+        """
+        Get the date of a single candle in nanoseconds, without converting the date column.
+        """
+
+        return dataframe['date'].iat[pos].value
+
+
+    @staticmethod
+    def _ohlc_at(dataframe: DataFrame, pos: int) -> tuple:
+        """
+        Get the open, high, low and close of a single candle, without creating a row Series.
+        """
+
+        return (float(dataframe['open'].iat[pos]), float(dataframe['high'].iat[pos]),
+                float(dataframe['low'].iat[pos]), float(dataframe['close'].iat[pos]))
+
+
+    def _full(self, dataframe: DataFrame):
+        """
+        Calculate the Supertrend over the complete dataframe and store the state.
+        """
+
+        self.reset()
+
+        open, high, low, close = dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close']
+
+        m = close.size
+        dir_, trend = np.ones(m, dtype=np.int8), np.zeros(m, dtype=np.float64)
+        long, short = np.full(m, npNaN), np.full(m, npNaN)
+
+        middleband_value = middleband(open, high, low, close, self.source)
+
+        matr = self.multiplier
+        if self.change_atr_calculation:
+            volatility = atr(high, low, close, self.length)
+            self._atr = float(volatility.iloc[-1])
+        else:
+            tr = true_range(high, low, close)
+            volatility = sma(tr, self.length)
+            self._tr_window.extend(tr.iloc[-self.length:].tolist())
+        matr *= volatility
+
+        upperband = (middleband_value + matr).to_numpy(dtype=np.float64, copy=True)
+        lowerband = (middleband_value - matr).to_numpy(dtype=np.float64, copy=True)
+
+        supertrend_kernel(close.to_numpy(dtype=np.float64), upperband, lowerband, dir_, trend, long, short)
+
+        self._upper = float(upperband[-1])
+        self._lower = float(lowerband[-1])
+
+        self._buffers = [trend, dir_, long, short]
+        self._start, self._end = 0, m
+        self._last_date = self._date_at(dataframe, m - 1)
+        self._last_ohlc = self._ohlc_at(dataframe, m - 1)
+
+
+    def _append(self, dataframe: DataFrame, dropped: int, new_from: int):
+        """
+        Calculate only the new candles, continuing from the stored state.
+        """
+
+        self._start += dropped
+
+        k = len(dataframe) - new_from
+        if k == 0:
+            return
+
+        open = dataframe['open'].iloc[new_from:].to_numpy(dtype=np.float64).tolist()
+        high = dataframe['high'].iloc[new_from:].to_numpy(dtype=np.float64).tolist()
+        low = dataframe['low'].iloc[new_from:].to_numpy(dtype=np.float64).tolist()
+        close = dataframe['close'].iloc[new_from:].to_numpy(dtype=np.float64).tolist()
+
+        # Element 0 holds the state of the last known candle; the kernel continues from there
+        prev_close = self._last_ohlc[3]
+        upperband, lowerband = np.empty(k + 1), np.empty(k + 1)
+        upperband[0], lowerband[0] = self._upper, self._lower
+
+        for i in range(k):
+            tr = max(high[i] - low[i], abs(high[i] - prev_close), abs(prev_close - low[i]))
+            if self.change_atr_calculation:
+                # Wilder smoothing, as used by both TA-Lib and the pandas-ta RMA
+                self._atr = self._atr + (tr - self._atr) / self.length
+                volatility = self._atr
+            else:
+                self._tr_window.append(tr)
+                volatility = sum(self._tr_window) / self.length
+
+            match self.source:
+                case "open":
+                    middleband_value = open[i]
+                case "high":
+                    middleband_value = high[i]
+                case "low":
+                    middleband_value = low[i]
+                case "close":
+                    middleband_value = close[i]
+                case _:
+                    middleband_value = 0.5 * (high[i] + low[i])
+
+            matr = self.multiplier * volatility
+            upperband[i + 1] = middleband_value + matr
+            lowerband[i + 1] = middleband_value - matr
+            prev_close = close[i]
+
+        dir_ = np.empty(k + 1, dtype=np.int8)
+        trend, long, short = np.zeros(k + 1), np.full(k + 1, npNaN), np.full(k + 1, npNaN)
+        dir_[0] = self._buffers[1][self._end - 1]
+
+        supertrend_kernel(np.asarray([self._last_ohlc[3]] + close), upperband, lowerband, dir_, trend, long, short)
+
+        self._upper = float(upperband[-1])
+        self._lower = float(lowerband[-1])
+        self._last_date = self._date_at(dataframe, len(dataframe) - 1)
+        self._last_ohlc = self._ohlc_at(dataframe, len(dataframe) - 1)
+
+        # Store the new rows after the rows in use
+        self._reserve(k)
+        end = self._end + k
+        for buffer, values in zip(self._buffers, (trend, dir_, long, short)):
+            buffer[self._end:end] = values[1:]
+        self._end = end
+
+
+    def _reserve(self, count: int) -> None:
+        """
+        Make sure `count` more rows fit in the buffers. When they don't, new buffers with
+        double the used capacity are allocated, dropping the rows no longer used. Rows in
+        use are never changed, as results handed out before may still refer to them.
+        """
+
+        if self._end + count <= len(self._buffers[0]):
+            return
+
+        used = self._end - self._start
+        capacity = max(16, used * 2, used + count)
+        for idx, buffer in enumerate(self._buffers):
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:used] = buffer[self._start:self._end]
+            self._buffers[idx] = grown
+
+        self._start = 0
+        self._end = used
+
+
+    def _write(self, target: DataFrame, result: SupertrendResult, columns, new_from: int) -> DataFrame:
+        """
+        Write the results into the target. Only the new rows are written when the target already
+        has the columns with the values of the previous update (checked on the last known row).
+        """
+
+        size = len(result.trend)
+        tail = (
+            0 < new_from <= size
+            and len(target) == size
+            and all(column in target.columns for column in columns)
+            and all(target[column].dtype == values.dtype for column, values in zip(columns, result))
+            and _same_value(target[columns[0]].iat[new_from - 1], result.trend[new_from - 1])
+        )
+
+        if not tail:
+            return write_supertrend(target, SupertrendResult(*(values.copy() for values in result)), columns)
+
+        for column, values in zip(columns, result):
+            target.iloc[new_from:, target.columns.get_loc(column)] = values[new_from:]
+
+        return target
+
+
+def _same_value(a: float, b: float) -> bool:
+    """
+    Compare two values, where NaN equals NaN.
+    """
+
+    return a == b or (isnan(a) and isnan(b))
@@ -0,0 +1,19 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+### Test setup.
+##  - the root of the repository is added to the path, like the strategies directory of
+##    freqtrade, so `indicators` and `utils` are importable
+##  - the strategies are also importable as package `strategies`, because `dca_strategy`
+##    imports the base strategy relatively
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+if 'strategies' not in sys.modules:
+    package = importlib.util.module_from_spec(importlib.util.spec_from_loader('strategies', loader=None, is_package=True))
+    package.__path__ = [str(ROOT)]
+    sys.modules['strategies'] = package
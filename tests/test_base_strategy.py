@@ -0,0 +1,133 @@
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('freqtrade')
+pytest.importorskip('pandas_ta')
+
+from freqtrade.enums import RunMode
+from freqtrade.persistence import Trade
+
+from strategies.base_strategy import BaseStrategy
+
+
+def opentrade(tradeid: int, pair: str, stop_loss: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=tradeid, pair=pair, is_open=True, stop_loss=stop_loss, stop_loss_pct=-0.1, initial_stop_loss_pct=-0.1
+    )
+
+
+def create_strategy(runmode: RunMode = RunMode.DRY_RUN, **config) -> BaseStrategy:
+    strategy = BaseStrategy({
+        'max_open_trades': 3,
+        'async_logging': False,
+        'persistent_cache': False,
+        'state_journal': False,
+        **config
+    })
+    strategy.max_open_trades = 3
+    strategy.dp = SimpleNamespace(
+        runmode=runmode,
+        ticker=lambda pair: {'last': 100.0},
+        send_msg=lambda message: None
+    )
+
+    return strategy
+
+
+def candles(size: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=size, freq='5min', tz='UTC'),
+        'close': np.arange(size, dtype=np.float64)
+    })
+
+
+@pytest.fixture
+def strategy(monkeypatch):
+    # Trade 2 has its stoploss far from the initial stoploss, so it's counted as running in stoploss
+    trades = [opentrade(1, 'BTC/USDT', 90.0), opentrade(2, 'ETH/USDT', 120.0)]
+    monkeypatch.setattr(Trade, 'get_trades_proxy', staticmethod(lambda **kwargs: trades))
+
+    strategy = create_strategy()
+    strategy.enable_improved_trade_count = True
+
+    return strategy
+
+
+def test_bot_start_counts_trades_in_stoploss(strategy):
+    strategy.bot_start()
+
+    assert strategy.custom_info['stoploss-trades'] == {2}
+    assert strategy.max_open_trades == 4
+    assert strategy.config['max_open_trades'] == 4
+
+
+def test_rescan_without_tickers_keeps_running(strategy):
+    strategy.bot_start()
+
+    strategy.dp.ticker = lambda pair: {}
+    strategy.ticker_snapshot.clear()
+    strategy.rescan_trade_stoploss_ids()
+
+    assert strategy.custom_info['stoploss-trades'] == set()
+    assert strategy.max_open_trades == 3
+
+
+def test_persistent_cache_restores_dataframe_after_restart(tmp_path):
+    strategy = create_strategy(user_data_dir=str(tmp_path), persistent_cache=True)
+    strategy.bot_start()
+
+    strategy.cache_dataframe(candles(50), 'BTC/USDT', '5m')
+    strategy.flush_persistent_cache()
+
+    restarted = create_strategy(user_data_dir=str(tmp_path), persistent_cache=True)
+    restarted.bot_start()
+
+    pd.testing.assert_frame_equal(restarted.get_dataframe_from_cache('BTC/USDT', '5m'), candles(50))
+    assert restarted.get_cache_delta('BTC/USDT', '5m', candles(52)) == 2
+
+
+@pytest.mark.parametrize('runmode', [RunMode.BACKTEST, RunMode.HYPEROPT])
+def test_persistent_cache_untouched_outside_live(tmp_path, runmode):
+    strategy = create_strategy(user_data_dir=str(tmp_path), persistent_cache=True)
+    strategy.bot_start()
+
+    strategy.cache_dataframe(candles(50), 'BTC/USDT', '5m')
+    strategy.flush_persistent_cache()
+
+    files = sorted(tmp_path.rglob('*.feather'))
+    assert len(files) == 1
+
+    # Other indicator parameters would remove the files of the running bot
+    backtest = create_strategy(runmode, user_data_dir=str(tmp_path), persistent_cache=True)
+    backtest.timeframe = '1h'
+    backtest.bot_start()
+
+    assert backtest.custom_info['persistent-cache'] is None
+    assert backtest.get_dataframe_from_cache('BTC/USDT', '5m') is None
+
+    backtest.cache_dataframe(candles(60), 'BTC/USDT', '5m')
+    backtest.flush_persistent_cache()
+
+    assert sorted(tmp_path.rglob('*.feather')) == files
+    pd.testing.assert_frame_equal(pd.read_feather(files[0]), candles(50))
+
+
+def test_bot_start_survives_ticker_outage(strategy, caplog):
+    def ticker(pair):
+        raise ConnectionError("exchange unavailable")
+
+    strategy.dp.ticker = ticker
+
+    with caplog.at_level(logging.DEBUG, logger='freqtrade.strategy'):
+        strategy.bot_start()
+
+    assert strategy.custom_info['stoploss-trades'] == set()
+    assert strategy.ticker_snapshot.stats()['errors'] == 1
+
+    messages = "\n".join(caplog.messages)
+    assert "Failed to fetch tickers (ConnectionError: exchange unavailable); continuing with tickers fetched never." in messages
+    assert "Using tickers of 0 pairs, fetched never." in messages
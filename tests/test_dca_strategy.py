@@ -0,0 +1,131 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('freqtrade')
+pytest.importorskip('pandas_ta')
+
+from freqtrade.enums import RunMode
+from freqtrade.persistence import Trade
+
+from strategies.dca_strategy import DCAStrategy
+from utils.state_journal import StateJournal
+
+
+@pytest.fixture
+def strategy(tmp_path):
+    strategy = DCAStrategy({
+        'max_open_trades': 3,
+        'async_logging': False,
+        'persistent_cache': False,
+        'state_journal': False
+    })
+    strategy.pair_state_journal = StateJournal(tmp_path / 'journal.jsonl')
+
+    return strategy
+
+
+def test_initialize_pair_state_resets_existing_state(strategy):
+    pairstate = strategy.initialize_pair_state('BTC/USDT', 'long')
+
+    pairstate.last_profit_percentage = -2.5
+    pairstate.next_safety_order_profit_percentage = -3.0
+    pairstate.add_safety_order_on_profit_percentage = -3.5
+    pairstate.trailing_start_datetime = datetime(2024, 1, 1)
+    pairstate.open_safety_orders.append(1)
+
+    # A new trade on the same pair and side starts from the initial state
+    assert strategy.initialize_pair_state('BTC/USDT', 'long') is pairstate
+
+    assert pairstate.as_dict() == strategy.create_pair_state('BTC/USDT', 'long').as_dict()
+
+    strategy.pair_state_journal.close()
+    assert strategy.pair_state_journal.replay() == {('BTC/USDT', 'long'): pairstate.as_dict()}
+
+
+def test_initialize_pair_state_restores_before_journaling(strategy):
+    stored = strategy.create_pair_state('BTC/USDT', 'long')
+    stored.last_profit_percentage = -2.5
+    stored.add_safety_order_on_profit_percentage = -3.5
+    stored.trailing_start_datetime = datetime(2024, 1, 1)
+
+    strategy.custom_info['journal-states'] = {('BTC/USDT', 'long'): stored.as_dict()}
+
+    pairstate = strategy.initialize_pair_state('BTC/USDT', 'long', restore=True)
+
+    assert pairstate.trailing_start_datetime == datetime(2024, 1, 1)
+    assert strategy.custom_info['journal-states'] == {}
+
+    # Only the restored state is journaled, never the initial (reset) state
+    strategy.pair_state_journal.close()
+
+    lines = strategy.pair_state_journal.path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 1
+    assert strategy.pair_state_journal.replay() == {('BTC/USDT', 'long'): pairstate.as_dict()}
+
+
+@pytest.mark.parametrize('runmode', [RunMode.BACKTEST, RunMode.HYPEROPT])
+def test_backtest_leaves_journal_untouched(tmp_path, monkeypatch, runmode):
+    monkeypatch.setattr(Trade, 'get_trades_proxy', staticmethod(lambda **kwargs: []))
+
+    # Journal of the dry-run bot, with the state of an open trade
+    journal = StateJournal(tmp_path / 'state_journal' / 'DCAStrategy-dry_run.jsonl')
+    journal.record('BTC/USDT', 'long', {'last_profit_percentage': -2.5})
+    journal.close()
+
+    contents = journal.path.read_bytes()
+
+    # Backtesting with the config of the dry-run bot
+    strategy = DCAStrategy({
+        'max_open_trades': 3,
+        'dry_run': True,
+        'user_data_dir': str(tmp_path),
+        'async_logging': False,
+        'persistent_cache': False,
+        'state_journal': True
+    })
+    strategy.dp = SimpleNamespace(runmode=runmode, send_msg=lambda message: None)
+    strategy.bot_start()
+
+    assert strategy.pair_state_journal is None
+    assert strategy.custom_info['journal-states'] == {}
+
+    pairstate = strategy.initialize_pair_state('BTC/USDT', 'long')
+    strategy.journal_pair_state(pairstate)
+
+    assert journal.path.read_bytes() == contents
+    assert sorted(path.name for path in journal.path.parent.iterdir()) == ['DCAStrategy-dry_run.jsonl']
+
+
+def test_stoploss_level_without_profit_levels(strategy):
+    assert strategy.get_stoploss_level(None, 5.0) == (False, 0.0, 0.0, 0.0, 0)
+    assert strategy.get_stoploss_config(5.0, 'BTC/USDT_long') == (False, 0.0, 0.0, 0.0, 0)
+
+
+def test_dca_table_template_bound_to_pair_config(strategy):
+    strategy.stake_amount = 20.0
+    strategy.load_safety_config({
+        'default': {'initial_so_amount': 10.0, 'price_deviation': 1.0, 'volume_scale': 1.5, 'step_scale': 1.0, 'max_so': 3}
+    })
+
+    table = strategy.get_initial_dca_table('BTC/USDT', 'long')
+    pairconfig = strategy.pair_configs.get('BTC/USDT', strategy.trading_direction)
+
+    assert table == pairconfig.dca_table_template
+    assert len(table) == 3
+
+    # Trades get a copy; shifting the orders of a trade leaves the template untouched
+    table[0]['total_deviation_current'] -= 1.0
+    assert strategy.get_initial_dca_table('BTC/USDT', 'long') == pairconfig.dca_table_template
+    assert table != pairconfig.dca_table_template
+
+    # Pairs with the same Safety Order configuration share the template
+    strategy.get_initial_dca_table('ETH/USDT', 'long')
+    assert strategy.pair_configs.get('ETH/USDT', strategy.trading_direction).dca_table_template is pairconfig.dca_table_template
+
+    # A new configuration binds a new template
+    strategy.load_safety_config({'default': {'max_so': 2}})
+
+    assert len(strategy.get_initial_dca_table('BTC/USDT', 'long')) == 2
+    assert strategy.pair_configs.get('BTC/USDT', strategy.trading_direction).dca_table_template is not pairconfig.dca_table_template
@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+from utils.dca_table import DCALadder, decode_dca_table, encode_dca_table
+
+
+def ladder() -> DCALadder:
+    return DCALadder(
+        orders=[1, 2, 3],
+        deviation_current=[-1.0, -2.0, -4.0],
+        deviation_initial=[-1.0, -2.0, -4.0],
+        total_deviation_current=[-1.0, -3.0, -7.0],
+        total_deviation_initial=[-1.0, -3.0, -7.0],
+        volume=[10.0, 20.0, 40.0],
+        total_volume=[20.0, 40.0, 80.0]
+    )
+
+
+def random_table(size: int, rng: random.Random) -> list:
+    table, total = [], 0.0
+    for order in range(1, size + 1):
+        deviation = -rng.uniform(0.5, 3.0)
+        total += deviation
+        table.append({
+            'order': order,
+            'deviation_current': deviation,
+            'deviation_initial': deviation,
+            'total_deviation_current': total,
+            'total_deviation_initial': total,
+            'volume': float(order),
+            'total_volume': float(order * 2)
+        })
+
+    return table
+
+
+def shift_in_place(table: list, start_from_order: int, shift_percentage: float, only_total: bool):
+    """
+    Shift of the list of dicts, as the strategy did before the ladder.
+    """
+
+    for safetyorder in table:
+        if safetyorder['order'] < start_from_order:
+            continue
+        if (not only_total) and (safetyorder['order'] == start_from_order):
+            safetyorder['deviation_current'] += shift_percentage
+        safetyorder['total_deviation_current'] += shift_percentage
+
+
+def assert_same_table(result: list, expected: list):
+    assert len(result) == len(expected)
+    for order, expected_order in zip(result, expected):
+        assert order == pytest.approx(expected_order, rel=1e-12, abs=1e-12)
+
+
+def test_shift_equals_shifting_dicts():
+    shifted = ladder()
+    shifted.shift(2, -0.5)
+    shifted.shift(3, 0.25, only_total=True)
+
+    assert [order['deviation_current'] for order in shifted] == [-1.0, -2.5, -4.0]
+    assert [order['total_deviation_current'] for order in shifted] == [-1.0, -3.5, -7.25]
+
+    assert decode_dca_table(encode_dca_table(shifted)).table() == shifted.table()
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_shifts_equal_shifting_dicts(seed):
+    rng = random.Random(seed)
+    table = random_table(40, rng)
+
+    shifted = DCALadder.from_table(table)
+    expected = [dict(order) for order in table]
+
+    for _ in range(rng.randint(1, 30)):
+        shift = (rng.randint(1, 42), rng.uniform(-2.0, 2.0), rng.random() < 0.3)
+        shifted.shift(*shift)
+        shift_in_place(expected, *shift)
+
+        # Resolved per order, also right after a shift
+        assert shifted[-1] == pytest.approx(expected[-1], rel=1e-12, abs=1e-12)
+
+    assert_same_table(shifted.table(), expected)
+    assert_same_table(shifted[5:15], expected[5:15])
+    assert_same_table(decode_dca_table(encode_dca_table(shifted)).table(), expected)
+
+    # The number of crossed orders is the same as a walk over the orders
+    for start in (0, 10, 39, 40):
+        for price_deviation in (0.0, -5.0, -20.0, -60.0, -200.0):
+            walked = 0
+            for order in expected[start:]:
+                if price_deviation > order['total_deviation_current']:
+                    break
+                walked += 1
+
+            assert shifted.count_crossed(start, price_deviation) == walked
+
+
+def test_extend_does_not_shift_new_orders():
+    shifted = ladder()
+    shifted.shift(2, -0.5)
+
+    shifted.extend([{
+        'order': 4, 'deviation_current': -8.0, 'deviation_initial': -8.0, 'total_deviation_current': -15.0,
+        'total_deviation_initial': -15.0, 'volume': 80.0, 'total_volume': 160.0
+    }])
+
+    assert shifted.shifts == []
+    assert [order['total_deviation_current'] for order in shifted] == [-1.0, -3.5, -7.5, -15.0]
+
+
+def test_repr_has_no_side_effects():
+    shifted = ladder()
+    shifted.shift(2, -0.5)
+
+    stored = encode_dca_table(shifted)
+    text = repr(shifted)
+
+    assert encode_dca_table(shifted) == stored
+    assert text == repr(shifted.table())
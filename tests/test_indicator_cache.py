@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from pandas import DataFrame, Series
+
+pytest.importorskip('pandas_ta')
+
+from indicators.cache import IndicatorCache
+
+
+def frame(rows: int) -> DataFrame:
+    return DataFrame({'close': np.arange(rows, dtype=np.float64)})
+
+
+def test_cache_hit_on_same_candles():
+    cache = IndicatorCache()
+    dataframe = frame(100)
+
+    first = cache.frame('BTC/USDT', '5m', dataframe).hl2(dataframe['close'], dataframe['close'])
+    second = cache.frame('BTC/USDT', '5m', dataframe).hl2(dataframe['close'], dataframe['close'])
+
+    assert second is first
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['bytes'] == 100 * 8
+
+
+def test_cache_bounded_by_bytes():
+    cache = IndicatorCache(max_bytes=3 * 1000 * 8)
+
+    for index in range(5):
+        cache.get(('BTC/USDT', '5m', None, 1000), 'series', index, lambda: Series(np.zeros(1000)))
+
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] == 3 * 1000 * 8
+    assert stats['evictions'] == 2
+
+
+def test_new_candles_drop_entries_and_bytes():
+    cache = IndicatorCache()
+
+    dataframe = frame(100)
+    cache.frame('BTC/USDT', '5m', dataframe).hl2(dataframe['close'], dataframe['close'])
+
+    dataframe = frame(101)
+    cache.frame('BTC/USDT', '5m', dataframe)
+
+    stats = cache.stats()
+    assert stats['entries'] == 0
+    assert stats['bytes'] == 0
+    assert stats['invalidations'] == 1
@@ -0,0 +1,58 @@
+import logging
+import threading
+
+from utils.log_queue import enable_queue_logging
+
+
+class Argument:
+    """
+    Mutable argument of a log message that records on which thread it is formatted.
+    """
+
+    def __init__(self):
+        self.value = 1
+        self.formatted = []
+
+
+    def __str__(self):
+        self.formatted.append(threading.current_thread().name)
+        return f"argument {self.value}"
+
+
+class CollectHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def test_records_formatted_when_logged():
+    collect = CollectHandler()
+    root = logging.getLogger()
+    root.addHandler(collect)
+
+    logger = logging.getLogger('test_log_queue')
+    logger.setLevel(logging.INFO)
+
+    try:
+        listener = enable_queue_logging(logger)
+
+        argument = Argument()
+        logger.info("value %s", argument)
+        logger.debug("not enabled %s", argument)
+
+        # Changed after logging, before the listener writes the record
+        argument.value = 2
+
+        # Stopping processes the queue; start again for the stop on exit
+        listener.stop()
+        listener.start()
+    finally:
+        root.removeHandler(collect)
+
+    assert collect.messages == ["value argument 1"]
+    assert argument.formatted == [threading.current_thread().name]
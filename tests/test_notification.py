@@ -0,0 +1,53 @@
+import time
+
+from utils.notification import NotificationThrottle
+
+
+def test_rate_cap_counts_dropped_messages():
+    throttle = NotificationThrottle(max_per_minute=2)
+
+    sent = [throttle.submit(f"message {index}", pair=f"PAIR{index}", now=0.0) for index in range(3)]
+
+    assert sent == [["message 0"], ["message 1"], []]
+    assert throttle.stats()['suppressed_rate'] == 1
+
+
+def test_digest_kept_at_cap_not_counted_as_suppressed():
+    throttle = NotificationThrottle(digest_interval_seconds=10, max_per_minute=1)
+    start = time.monotonic()
+
+    assert throttle.submit("first", pair="A", now=start + 10.0) == ["first"]
+    assert throttle.submit("second", pair="B", now=start + 20.0) == []
+    assert throttle.flush(now=start + 30.0) == []
+
+    stats = throttle.stats()
+    assert stats['suppressed_rate'] == 0
+    assert stats['pending'] == 1
+
+    # The kept message is send once the cap allows it
+    assert throttle.flush(now=start + 80.0) == ["second"]
+
+
+def test_urgent_messages_not_throttled():
+    throttle = NotificationThrottle(debounce_seconds=60, max_per_minute=1)
+
+    assert throttle.submit("info", pair="A", category='info', now=0.0) == ["info"]
+    assert throttle.submit("warning", pair="A", category='warning', now=1.0, urgent=True) == ["warning"]
+    assert throttle.submit("error", pair="A", category='error', now=2.0, urgent=True) == ["error"]
+    assert throttle.submit("error", pair="A", category='error', now=3.0, urgent=True) == ["error"]
+
+    # Urgent messages count towards the cap of the other messages
+    assert throttle.submit("info", pair="B", category='info', now=4.0) == []
+
+    stats = throttle.stats()
+    assert stats['suppressed_debounce'] == 0
+    assert stats['suppressed_rate'] == 1
+
+
+def test_urgent_messages_not_collected_in_digest():
+    throttle = NotificationThrottle(digest_interval_seconds=60)
+    start = time.monotonic()
+
+    assert throttle.submit("trailing", pair="A", category='trailing', now=start) == []
+    assert throttle.submit("error", pair="A", category='error', now=start + 1.0, urgent=True) == ["error"]
+    assert throttle.stats()['pending'] == 1
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from utils.state_journal import StateJournal
+
+
+def test_records_buffered_until_sync(tmp_path):
+    journal = StateJournal(tmp_path / 'journal.jsonl', sync_interval=3600)
+
+    journal.record('BTC/USDT', 'long', {'last_profit_percentage': -1.5})
+    journal.record('ETH/USDT', 'long', {'trailing_start_datetime': datetime(2024, 1, 1, 12)})
+    journal.remove('BTC/USDT', 'long')
+
+    # Nothing is written by the records themselves
+    assert not journal.path.exists()
+    assert journal.stats()['pending'] == 3
+
+    # Within the sync interval only a forced sync writes
+    assert journal.sync() is False
+    assert journal.sync(force=True) is True
+    assert journal.sync(force=True) is False
+
+    stats = journal.stats()
+    assert stats['syncs'] == 1
+    assert stats['pending'] == 0
+    assert stats['records'] == 3
+
+    assert journal.replay() == {('ETH/USDT', 'long'): {'trailing_start_datetime': datetime(2024, 1, 1, 12)}}
+
+
+def test_sync_after_interval(tmp_path):
+    journal = StateJournal(tmp_path / 'journal.jsonl', sync_interval=0)
+
+    journal.record('BTC/USDT', 'long', {'last_profit_percentage': -1.5})
+
+    assert journal.sync() is True
+    assert journal.replay() == {('BTC/USDT', 'long'): {'last_profit_percentage': -1.5}}
+
+
+def test_close_writes_pending_records(tmp_path):
+    journal = StateJournal(tmp_path / 'journal.jsonl', sync_interval=3600)
+
+    journal.record('BTC/USDT', 'long', {'last_profit_percentage': -1.5})
+    journal.close()
+
+    assert journal.replay() == {('BTC/USDT', 'long'): {'last_profit_percentage': -1.5}}
+
+
+def test_compact_keeps_one_line_per_key(tmp_path):
+    journal = StateJournal(tmp_path / 'journal.jsonl', sync_interval=3600, compact_after=3)
+
+    for index in range(3):
+        journal.record('BTC/USDT', 'long', {'last_profit_percentage': float(index)})
+
+    assert journal.needs_compaction()
+
+    journal.compact({('BTC/USDT', 'long'): {'last_profit_percentage': 2.0}})
+
+    assert not journal.needs_compaction()
+    assert journal.path.read_text(encoding='utf-8').count("\n") == 1
+    assert journal.replay() == {('BTC/USDT', 'long'): {'last_profit_percentage': 2.0}}
+
+
+def test_torn_line_skipped(tmp_path):
+    journal = StateJournal(tmp_path / 'journal.jsonl')
+
+    journal.record('BTC/USDT', 'long', {'last_profit_percentage': -1.5})
+    journal.close()
+
+    with open(journal.path, 'a', encoding='utf-8') as file:
+        file.write('{"pair":"BTC/USDT","side":"lo')
+
+    assert journal.replay() == {('BTC/USDT', 'long'): {'last_profit_percentage': -1.5}}
+    assert journal.stats()['errors'] == 1
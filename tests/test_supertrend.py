@@ -0,0 +1,291 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pandas_ta')
+
+from numpy import nan as npNaN
+from pandas import DataFrame
+from pandas_ta.overlap import hl2, sma
+from pandas_ta.volatility import atr, true_range
+from pandas_ta.utils import get_offset, verify_series
+
+from indicators.cache import IndicatorCache
+from indicators.supertrend import SupertrendStream, supertrend, supertrend_batch
+
+SOURCES = ('open', 'high', 'low', 'close', 'hl2')
+
+
+def supertrend_reference(open, high, low, close, length=None, multiplier=None, source='hl2', change_atr_calculation=False, offset=None, **kwargs):
+    """
+    The Supertrend as it was before the loop moved to NumPy buffers; per row `.iloc` indexing.
+    """
+
+    length = int(length) if length and length > 0 else 7
+    multiplier = float(multiplier) if multiplier and multiplier > 0 else 3.0
+    open = verify_series(open, length)
+    high = verify_series(high, length)
+    low = verify_series(low, length)
+    close = verify_series(close, length)
+    offset = get_offset(offset)
+
+    if open is None or high is None or low is None or close is None: return
+
+    m = close.size
+    dir_, trend = [1] * m, [0] * m
+    long, short = [npNaN] * m, [npNaN] * m
+
+    if source == "open":
+        middleband_value = open
+    elif source == "high":
+        middleband_value = high
+    elif source == "low":
+        middleband_value = low
+    elif source == "close":
+        middleband_value = close
+    else:
+        middleband_value = hl2(high, low)
+
+    matr = multiplier
+    if change_atr_calculation:
+        matr *= atr(high, low, close, length)
+    else:
+        matr *= sma(true_range(high, low, close), length)
+
+    upperband = middleband_value + matr
+    lowerband = middleband_value - matr
+
+    for i in range(1, m):
+        if close.iloc[i] > upperband.iloc[i - 1]:
+            dir_[i] = 1
+        elif close.iloc[i] < lowerband.iloc[i - 1]:
+            dir_[i] = -1
+        else:
+            dir_[i] = dir_[i - 1]
+
+        if dir_[i] > 0 and lowerband.iloc[i] < lowerband.iloc[i - 1]:
+            lowerband.iloc[i] = lowerband.iloc[i - 1]
+        if dir_[i] < 0 and upperband.iloc[i] > upperband.iloc[i - 1]:
+            upperband.iloc[i] = upperband.iloc[i - 1]
+
+        if dir_[i] > 0:
+            trend[i] = long[i] = lowerband.iloc[i]
+        else:
+            trend[i] = short[i] = upperband.iloc[i]
+
+    _props = f"_{length}_{multiplier}"
+    df = DataFrame({
+            f"SUPERT{_props}": trend,
+            f"SUPERTd{_props}": dir_,
+            f"SUPERTl{_props}": long,
+            f"SUPERTs{_props}": short,
+        }, index=close.index)
+
+    if offset != 0:
+        df = df.shift(offset)
+
+    return df
+
+
+def candles(size: int, seed: int = 0, leading_nan: int = 0) -> DataFrame:
+    """
+    Random walk 5m candles, optionally starting with rows of NaN (like a window before the data starts).
+    """
+
+    rng = np.random.default_rng(seed)
+
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, size))
+    open = np.concatenate(([100.0], close[:-1])) if size > 0 else close
+    high = np.maximum(open, close) + rng.uniform(0.0, 1.0, size)
+    low = np.minimum(open, close) - rng.uniform(0.0, 1.0, size)
+
+    dataframe = DataFrame({'open': open, 'high': high, 'low': low, 'close': close})
+    dataframe.iloc[:leading_nan] = npNaN
+    dataframe.insert(0, 'date', pd.date_range('2024-01-01', periods=size, freq='5min', tz='UTC'))
+
+    return dataframe
+
+
+def assert_same(result: DataFrame, expected: DataFrame):
+    """
+    Trend, direction, long and short must be identical (NaN on the same rows).
+    """
+
+    assert list(result.columns) == list(expected.columns)
+    for column in expected.columns:
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy(), err_msg=column)
+    assert result.index.equals(expected.index)
+
+
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+@pytest.mark.parametrize('source', SOURCES)
+@pytest.mark.parametrize('size, leading_nan', [(500, 0), (500, 25), (40, 0), (12, 3), (11, 0), (10, 0)])
+def test_supertrend_equals_reference(source, change_atr_calculation, size, leading_nan):
+    dataframe = candles(size, seed=size + leading_nan, leading_nan=leading_nan)
+    args = (dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'])
+
+    result = supertrend(*args, length=10, multiplier=3.0, source=source, change_atr_calculation=change_atr_calculation)
+    expected = supertrend_reference(*args, length=10, multiplier=3.0, source=source, change_atr_calculation=change_atr_calculation)
+
+    assert_same(result, expected)
+
+
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+@pytest.mark.parametrize('size', [0, 1, 5, 9])
+def test_supertrend_too_short(change_atr_calculation, size):
+    dataframe = candles(size)
+    args = (dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'])
+
+    assert supertrend(*args, length=10, change_atr_calculation=change_atr_calculation) is None
+    assert supertrend_reference(*args, length=10, change_atr_calculation=change_atr_calculation) is None
+
+
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+@pytest.mark.parametrize('source', SOURCES)
+def test_supertrend_arrays_equal_reference(source, change_atr_calculation):
+    dataframe = candles(300, seed=7, leading_nan=12)
+    args = (dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'])
+
+    result = supertrend(*args, length=7, multiplier=2.5, source=source, change_atr_calculation=change_atr_calculation, output='arrays')
+    expected = supertrend_reference(*args, length=7, multiplier=2.5, source=source, change_atr_calculation=change_atr_calculation)
+
+    for values, column in zip(result, expected.columns):
+        np.testing.assert_array_equal(values, expected[column].to_numpy(), err_msg=column)
+
+
+def test_supertrend_offset_equals_reference():
+    dataframe = candles(200, seed=3)
+    args = (dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'])
+
+    assert_same(supertrend(*args, length=10, offset=2), supertrend_reference(*args, length=10, offset=2))
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+def test_supertrend_batch_equals_supertrend(change_atr_calculation, use_cache):
+    dataframe = candles(300, seed=11, leading_nan=5)
+    args = (dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'])
+    cache = IndicatorCache().frame('BTC/USDT', '5m', dataframe) if use_cache else None
+
+    batch = supertrend_batch(*args, lengths=(7, 10, 14), multipliers=(2.0, 3.0), sources=('hl2', 'close'),
+                             change_atr_calculation=change_atr_calculation, cache=cache)
+
+    for length, multiplier, source in batch.combinations:
+        idx = batch.column(length, multiplier, source)
+        expected = supertrend(*args, length=length, multiplier=multiplier, source=source,
+                              change_atr_calculation=change_atr_calculation, output='arrays')
+
+        for values, column in zip(expected, ('trend', 'direction', 'long', 'short')):
+            np.testing.assert_allclose(getattr(batch, column)[:, idx], values, rtol=1e-12, err_msg=column)
+
+
+def full(dataframe: DataFrame, change_atr_calculation: bool, source: str = 'hl2', target: DataFrame = None):
+    return supertrend(dataframe['open'], dataframe['high'], dataframe['low'], dataframe['close'], 10, 3.0, source,
+                      change_atr_calculation, target=target)
+
+
+def assert_close(result: DataFrame, expected: DataFrame, columns=None):
+    """
+    Same columns and types; the same direction, and bands equal up to the rounding of the
+    continued ATR/SMA (see SupertrendStream).
+    """
+
+    columns = columns or list(expected.columns)
+    assert list(result[columns].dtypes) == list(expected[columns].dtypes)
+    trend, direction, long, short = columns
+    np.testing.assert_array_equal(result[direction].to_numpy(), expected[direction].to_numpy())
+    for column in (trend, long, short):
+        np.testing.assert_allclose(result[column].to_numpy(), expected[column].to_numpy(), rtol=1e-9, equal_nan=True, err_msg=column)
+
+
+def stream(change_atr_calculation: bool, source: str = 'hl2') -> SupertrendStream:
+    return SupertrendStream(10, 3.0, source, change_atr_calculation, timeframe_minutes=5)
+
+
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+@pytest.mark.parametrize('source', SOURCES)
+def test_stream_growing_equals_full(source, change_atr_calculation):
+    dataframe = candles(400, seed=11)
+    st = stream(change_atr_calculation, source)
+
+    for size in range(300, 400, 7):
+        window = dataframe.iloc[:size].reset_index(drop=True)
+        assert_close(st.update(window), full(window, change_atr_calculation, source))
+
+    assert st.full_updates == 1
+    assert st.incremental_updates > 1
+
+
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+def test_stream_sliding_equals_full(change_atr_calculation):
+    dataframe = candles(600, seed=12)
+    st = stream(change_atr_calculation)
+
+    for start in range(0, 100):
+        window = dataframe.iloc[start:start + 400].reset_index(drop=True)
+        result, expected = st.update(window), full(window, change_atr_calculation)
+
+        # The stream continues from the candles dropped at the start, where a fresh calculation
+        # warms up again; compare the rows after the fresh calculation has settled
+        assert_close(result.iloc[200:], expected.iloc[200:])
+
+    assert st.full_updates == 1
+
+
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+def test_stream_target_equals_full_target(change_atr_calculation):
+    dataframe = candles(500, seed=13)
+    columns = ['trend', 'direction', 'long', 'short']
+    st = stream(change_atr_calculation)
+
+    target = None
+    for size in range(400, 420):
+        window = dataframe.iloc[:size].copy()
+        if target is not None:
+            # Columns of the previous update present (new row not yet calculated); only the tail is written
+            for column in columns:
+                window[column] = np.concatenate((target[column].to_numpy(), np.zeros(1, dtype=target[column].dtype)))
+
+        target = st.update(window, target=window)
+        assert_close(target, full(dataframe.iloc[:size].copy(), change_atr_calculation, target=dataframe.iloc[:size].copy()), columns)
+
+    assert st.incremental_updates == 19
+
+
+@pytest.mark.parametrize('change', ['gap', 'reorder', 'rewritten', 'shifted', 'replaced'])
+@pytest.mark.parametrize('change_atr_calculation', [False, True])
+def test_stream_falls_back_to_full(change, change_atr_calculation):
+    dataframe = candles(500, seed=14)
+    st = stream(change_atr_calculation)
+    st.update(dataframe.iloc[:400].reset_index(drop=True))
+
+    window = dataframe.iloc[:405].copy()
+    if change == 'gap':
+        window = window.drop(index=402)
+    elif change == 'reorder':
+        window.iloc[[402, 403]] = window.iloc[[403, 402]].to_numpy()
+    elif change == 'rewritten':
+        window.loc[399, 'close'] += 1.0
+    elif change == 'shifted':
+        window['date'] += pd.Timedelta(minutes=5)
+    elif change == 'replaced':
+        window = candles(405, seed=15)
+    window = window.reset_index(drop=True)
+
+    result = st.update(window)
+
+    assert st.full_updates == 2
+    assert st.last_reason
+    # The full calculation is exactly the same calculation as supertrend()
+    expected = full(window, change_atr_calculation)
+    for column in expected.columns:
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy())
+
+
+def test_stream_too_short():
+    dataframe = candles(50, seed=16)
+    st = stream(False)
+
+    assert st.update(dataframe.iloc[:9]) is None
+    assert full(dataframe.iloc[:9], False) is None
+    assert_close(st.update(dataframe), full(dataframe, False))
@@ -0,0 +1,54 @@
+from utils.ticker_snapshot import TickerSnapshot
+
+
+class Exchange:
+    """
+    Tickers of an exchange that can be taken offline.
+    """
+
+    def __init__(self):
+        self.online = True
+        self.calls = 0
+
+
+    def fetch_tickers(self, pairs):
+        self.calls += 1
+        if not self.online:
+            raise ConnectionError("exchange unavailable")
+
+        return {pair: {'last': 1.0 + self.calls} for pair in pairs}
+
+
+def test_snapshot_reused_within_ttl():
+    exchange = Exchange()
+    snapshot = TickerSnapshot(exchange.fetch_tickers, ttl=60)
+
+    assert snapshot.get(['A', 'B']) == {'A': {'last': 2.0}, 'B': {'last': 2.0}}
+    assert snapshot.get(['B', 'A', 'A']) == {'B': {'last': 2.0}, 'A': {'last': 2.0}}
+    assert exchange.calls == 1
+
+    # A pair missing from the snapshot triggers a new fetch
+    assert snapshot.get(['C']) == {'C': {'last': 3.0}}
+    assert exchange.calls == 2
+
+
+def test_fetch_error_keeps_previous_snapshot():
+    exchange = Exchange()
+    errors = []
+    snapshot = TickerSnapshot(exchange.fetch_tickers, ttl=0, on_error=errors.append)
+
+    assert snapshot.get(['A']) == {'A': {'last': 2.0}}
+
+    exchange.online = False
+
+    assert snapshot.refresh(['A']) is False
+    assert snapshot.get(['A', 'B']) == {'A': {'last': 2.0}}
+
+    stats = snapshot.stats()
+    assert stats['errors'] == 2
+    assert stats['fetches'] == 1
+    assert [type(error) for error in errors] == [ConnectionError, ConnectionError]
+
+    exchange.online = True
+
+    assert snapshot.get(['A']) == {'A': {'last': 5.0}}
@@ -0,0 +1,92 @@
+from bisect import bisect_left, bisect_right
+
+### Level tables of the trailing and profit configuration, compiled for lookup by bisection.
+##  - the configuration has levels (index -> dict) per config pair key; the strategy walks
+##    the levels in order and stops at the first level of which the threshold is exceeded
+##    ("look one level further"), using the level before it
+##  - the thresholds are compiled as running maximum, which is sorted and stops at exactly
+##    the same level as the walk, also when the levels are not configured in ascending order
+##  - the values of the levels are compiled as tuples, in the order of the requested columns
+
+
+class LevelTable:
+    """
+    Levels of one config pair key, with the running maximum of their thresholds.
+    """
+
+    def __init__(self, levels: dict, threshold: str, columns: tuple):
+        """
+        :param levels: Levels as configured (index -> dict), in the order they are walked
+        :param threshold: Name of the value deciding if the walk stops at a level
+        :param columns: Names of the values to compile per level (missing values are None)
+        """
+
+        self.columns = tuple(columns)
+        self.rows = tuple(tuple(level.get(column) for column in self.columns) for level in levels.values())
+
+        thresholds = []
+        for level in levels.values():
+            value = float(level[threshold])
+            thresholds.append(value if not thresholds or value > thresholds[-1] else thresholds[-1])
+
+        self.thresholds = tuple(thresholds)
+
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+    def __getitem__(self, index) -> tuple:
+        return self.rows[index]
+
+
+    def count_not_above(self, value: float) -> int:
+        """
+        Count the levels walked before the first level of which the threshold is above the value.
+
+        :param value: Value to compare the thresholds with
+        :return int: Number of walked levels (all levels when none is above the value)
+        """
+
+        return bisect_right(self.thresholds, value)
+
+
+    def count_until(self, exceeded) -> int:
+        """
+        Count the levels walked before the first level for which `exceeded(threshold)` is True.
+        The function must be non-decreasing in the threshold (False for low, True for high thresholds).
+
+        :param exceeded: Function of the threshold, True when the walk stops at the level
+        :return int: Number of walked levels (all levels when the walk does not stop)
+        """
+
+        return bisect_left(self.thresholds, True, key=exceeded)
+
+
+def compile_level_tables(configuration: dict, threshold: str, columns: tuple) -> dict:
+    """
+    Compile the levels of every config pair key.
+
+    :param configuration: Config pair key -> levels (index -> dict)
+    :param threshold: Name of the value deciding if the walk stops at a level
+    :param columns: Names of the values to compile per level
+    :return dict: Config pair key -> LevelTable
+    """
+
+    return {key: LevelTable(levels, threshold, columns) for key, levels in configuration.items()}
+
+
+def get_level_table(tables: dict, config_pair_key: str):
+    """
+    Get the levels of a config pair key, or of 'default' when the key is not configured.
+
+    :param tables: Config pair key -> LevelTable
+    :param config_pair_key: Key to use for looking up data in the configuration.
+    :return LevelTable: The levels, or None when neither is configured
+    """
+
+    levels = tables.get(config_pair_key)
+    if levels is None:
+        levels = tables.get('default')
+
+    return levels
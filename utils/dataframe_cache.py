@@ -0,0 +1,442 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+from pandas import DataFrame, DatetimeTZDtype, Series, Timestamp
+
+### Memory bounded cache for dataframes (per pair and timeframe), used by the strategies
+##  to keep calculated (informative) dataframes between candles.
+##  - the size of every entry is measured with `memory_usage(deep=True)`, and the least
+##    recently used entries are evicted when the byte budget is exceeded
+##  - every entry has its own time to live (usually derived from the timeframe), and is
+##    removed when it's expired
+##  - hits, misses, evictions and expirations are counted for logging purposes
+##  - `AppendOnlyFrame` keeps one growing columnar buffer per key, so refreshing the
+##    cache only copies the new candles instead of the whole dataframe
+##  - a marker (last candle date, row count) is stored with every entry, so checking if
+##    the cache is up to date doesn't require access to the cached dataframe
+
+# Returned by `candle_delta` when the new candles don't continue the cached candles
+HISTORY_REWRITTEN = -1
+
+
+class DataFrameCache:
+    """
+    LRU cache of dataframes with a byte budget and per entry time to live.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        :param max_bytes: Maximum number of bytes used by all cached dataframes together
+        """
+
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def set(self, key, df, ttl: float, size: int = None, marker: tuple = None) -> None:
+        """
+        Store (or replace) a dataframe in the cache.
+
+        :param key: Key to store the dataframe under
+        :param df: Dataframe (or AppendOnlyFrame) to store (not copied)
+        :param ttl: Time to live in seconds
+        :param size: Size in bytes; measured with `memory_usage(deep=True)` when not given
+        :param marker: Optional marker of the candles, as created by `candle_marker()`
+        """
+
+        self.remove(key)
+
+        if size is None:
+            size = int(df.memory_usage(deep=True).sum())
+        self._entries[key] = {
+            'df': df,
+            'bytes': size,
+            'expires': time.monotonic() + ttl,
+            'marker': marker
+        }
+        self._bytes += size
+
+        self._evict()
+
+
+    def get(self, key):
+        """
+        Get a dataframe from the cache. Expired entries are removed and not returned.
+
+        :param key: Key of the dataframe
+        :return DataFrame: The cached dataframe, or None when not present or expired
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry['expires'] < time.monotonic():
+            self.remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry['df']
+
+
+    def peek(self, key):
+        """
+        Get a dataframe from the cache without updating the counters or the LRU order.
+
+        :param key: Key of the dataframe
+        :return: The cached dataframe, or None when not present or expired
+        """
+
+        entry = self._entries.get(key)
+        if entry is None or entry['expires'] < time.monotonic():
+            return None
+
+        return entry['df']
+
+
+    def marker(self, key):
+        """
+        Get the marker stored with a dataframe, without accessing the dataframe.
+
+        :param key: Key of the dataframe
+        :return tuple: (last candle date, row count), or None when not present or expired
+        """
+
+        entry = self._entries.get(key)
+        if entry is None or entry['expires'] < time.monotonic():
+            return None
+
+        return entry['marker']
+
+
+    def remove(self, key) -> bool:
+        """
+        Remove an entry from the cache.
+
+        :param key: Key of the entry
+        :return bool: True if the entry was present
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+
+        self._bytes -= entry['bytes']
+
+        return True
+
+
+    def cleanup(self) -> list:
+        """
+        Remove all expired entries.
+
+        :return list: Keys of the removed entries
+        """
+
+        now = time.monotonic()
+
+        outdatedkeys = [key for key, entry in self._entries.items() if entry['expires'] < now]
+        for key in outdatedkeys:
+            self.remove(key)
+
+        self.expirations += len(outdatedkeys)
+
+        return outdatedkeys
+
+
+    def clear(self) -> None:
+        """
+        Remove all entries. Counters are kept.
+        """
+
+        self._entries.clear()
+        self._bytes = 0
+
+
+    def stats(self) -> dict:
+        """
+        Get the cache statistics, for logging purposes.
+
+        :return dict: Number of entries, bytes used, hits, misses, evictions, expirations and hit ratio
+        """
+
+        lookups = self.hits + self.misses
+
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+    def _evict(self) -> None:
+        """
+        Evict least recently used entries until the byte budget is met. The most recent
+        entry is never evicted, even when it exceeds the budget on its own.
+        """
+
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self.remove(next(iter(self._entries)))
+            self.evictions += 1
+
+
+def candle_marker(df: DataFrame, date_column: str = 'date') -> tuple:
+    """
+    Create the marker of the candles in a dataframe.
+
+    :param df: Dataframe with the candles
+    :param date_column: Column with the (ascending) candle dates
+    :return tuple: Date of the last candle (int64 nanoseconds, None when empty) and the number of rows
+    """
+
+    rows = len(df)
+    if rows == 0:
+        return None, 0
+
+    return Timestamp(df[date_column].iat[-1]).value, rows
+
+
+def candle_delta(marker: tuple, df: DataFrame, candle_ns: int, date_column: str = 'date') -> int:
+    """
+    Determine how many candles of the dataframe are newer than the candles of the marker.
+    Only the last candle, and the candle that should match the last known candle, are read.
+
+    :param marker: Marker of the known candles, as created by `candle_marker()`
+    :param df: Dataframe with the current candles
+    :param candle_ns: Duration of a candle in nanoseconds
+    :param date_column: Column with the (ascending) candle dates
+    :return int: Number of new rows (0 when up to date), or HISTORY_REWRITTEN when the
+                 dataframe doesn't continue the known candles (or nothing was known)
+    """
+
+    if marker is None or marker[0] is None or len(df) == 0:
+        return HISTORY_REWRITTEN
+
+    old_last, old_rows = marker
+    rows = len(df)
+
+    diff = Timestamp(df[date_column].iat[-1]).value - old_last
+    if diff == 0:
+        return 0 if rows == old_rows else HISTORY_REWRITTEN
+
+    if diff < 0 or candle_ns <= 0 or diff % candle_ns != 0:
+        return HISTORY_REWRITTEN
+
+    # The last known candle must be present at the expected position
+    delta = diff // candle_ns
+    pos = rows - 1 - delta
+    if pos < 0 or Timestamp(df[date_column].iat[pos]).value != old_last:
+        return HISTORY_REWRITTEN
+
+    return delta
+
+
+class AppendOnlyFrame:
+    """
+    Growing columnar storage for a dataframe of candles, to which only new candles
+    are appended. The buffers grow by doubling their capacity, so appending costs
+    O(new rows). When the dataframe doesn't continue the stored candles (history
+    was rewritten, columns changed) everything is copied again.
+
+    `view()` hands out a dataframe on top of the buffers, without copying the columns
+    with a NumPy dtype (timezone aware dates are rebuilt). The arrays of the view are
+    read-only; changing values in place raises an error, adding columns is fine.
+    The view has a RangeIndex, like the dataframes provided by freqtrade.
+    """
+
+    def __init__(self, df: DataFrame, date_column: str = 'date'):
+        """
+        :param df: Dataframe with the initial candles
+        :param date_column: Column with the (ascending) candle dates
+        """
+
+        self.date_column = date_column
+
+        # Number of appends and full copies, for logging purposes
+        self.appended_rows = 0
+        self.rebuilds = 0
+
+        self._reset(df)
+
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes allocated for the buffers.
+        """
+
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+
+    @property
+    def last_date(self):
+        """
+        Date of the last stored candle (as int64 nanoseconds), or None when empty.
+        """
+
+        if self._end == self._start:
+            return None
+
+        return int(self._dates[self._end - 1])
+
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+
+    def append(self, df: DataFrame) -> int:
+        """
+        Update the storage with the given dataframe. Only candles newer than the last
+        stored candle are copied; candles no longer present at the start of the
+        dataframe are dropped from the view.
+
+        :param df: Dataframe with the current candles
+        :return int: Number of appended rows, or -1 when all rows had to be copied again
+        """
+
+        if list(df.columns) != self._columns or len(df) == 0 or len(self) == 0:
+            self._reset(df)
+            return -1
+
+        dates = self._date_values(df[self.date_column])
+
+        # Position of the first new candle in the dataframe, and of the first candle of the dataframe in the storage
+        last_date = self._dates[self._end - 1]
+        new_from = int(np.searchsorted(dates, last_date, side='right'))
+        start = self._start + int(np.searchsorted(self._dates[self._start:self._end], dates[0]))
+
+        if (new_from == 0 or dates[new_from - 1] != last_date or start >= self._end
+                or self._dates[start] != dates[0] or (self._end - start) != new_from):
+            self._reset(df)
+            return -1
+
+        # Candles before the start of the dataframe are no longer used
+        self._start = start
+
+        count = len(df) - new_from
+        if count > 0:
+            self._reserve(count)
+
+            end = self._end + count
+            for column in self._columns:
+                self._buffers[column][self._end:end] = self._column_values(df[column])[new_from:]
+
+            self._end = end
+            self.appended_rows += count
+
+        return count
+
+
+    def view(self) -> DataFrame:
+        """
+        Get a read-only dataframe on top of the stored candles.
+
+        :return DataFrame: The stored candles
+        """
+
+        columns = {}
+        for column in self._columns:
+            values = self._buffers[column][self._start:self._end].view()
+            values.flags.writeable = False
+
+            dtype = self._dtypes[column]
+            if dtype == values.dtype:
+                columns[column] = values
+            else:
+                columns[column] = Series(values, dtype=dtype)
+
+        return DataFrame(columns, copy=False)
+
+
+    def _reset(self, df: DataFrame) -> None:
+        """
+        Copy all rows of the dataframe into new buffers.
+        """
+
+        self._columns = list(df.columns)
+        self._dtypes = {column: df[column].dtype for column in self._columns}
+        self._buffers = {}
+
+        capacity = max(16, len(df) * 2)
+        for column in self._columns:
+            values = self._column_values(df[column])
+            self._buffers[column] = np.empty(capacity, dtype=values.dtype)
+            self._buffers[column][:len(values)] = values
+
+        self._start = 0
+        self._end = len(df)
+        self._dates = self._buffers[self.date_column].view(np.int64)
+        self.rebuilds += 1
+
+
+    def _reserve(self, count: int) -> None:
+        """
+        Make sure `count` more rows fit in the buffers. When they don't, new buffers with
+        double the used capacity are allocated, dropping the rows no longer used. Existing
+        buffers are never moved in place, as views handed out before still refer to them.
+        """
+
+        if self._end + count <= len(self._dates):
+            return
+
+        used = self._end - self._start
+        capacity = max(16, used * 2, used + count)
+        for column, buffer in self._buffers.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:used] = buffer[self._start:self._end]
+            self._buffers[column] = grown
+
+        self._dates = self._buffers[self.date_column].view(np.int64)
+        self._start = 0
+        self._end = used
+
+
+    @staticmethod
+    def _column_values(series: Series) -> np.ndarray:
+        """
+        Get the values of a column as NumPy array; dates as (UTC) datetime64[ns].
+        """
+
+        if isinstance(series.dtype, DatetimeTZDtype):
+            return series.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+        if series.dtype.kind == 'M':
+            return series.to_numpy(dtype='datetime64[ns]')
+        if isinstance(series.dtype, np.dtype):
+            return series.to_numpy()
+
+        return series.to_numpy(dtype=object)
+
+
+    @staticmethod
+    def _date_values(series: Series) -> np.ndarray:
+        """
+        Get the dates as int64 nanoseconds, to compare with the stored dates.
+        """
+
+        return AppendOnlyFrame._column_values(series).view(np.int64)
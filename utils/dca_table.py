@@ -0,0 +1,342 @@
+import base64
+from bisect import bisect_left, bisect_right
+from operator import neg
+
+import numpy as np
+
+### DCA table (ladder of Safety Orders) of a trade, and its compact storage (in the custom
+##  data of the trade).
+##  - `DCALadder` keeps the columns of the table, and the shifts of the ladder as a list of
+##    shift points. The shift points are indexed as cumulative offsets per start order
+##    (prefix sums), so a shift costs O(number of shift points) and the current deviation
+##    of an order is resolved when it's accessed, with a bisection; the values are the same
+##    as shifting the dicts of the table in place (up to float rounding)
+##  - the table is used as a list of dicts (one dict per Safety Order) by the strategy;
+##    indexing creates the dict of one order only, iteration and `table()` of all orders
+##  - stored, the float columns are packed as one float64 array (base64 encoded), the
+##    order numbers as a list and the shift points as a list of lists; this is several
+##    times smaller than the list of dicts as JSON, and much faster to encode and decode
+##  - tables stored as list of dicts (before the compact format) are still accepted
+
+# Marker of the compact format, stored with the data
+DCA_TABLE_FORMAT = 'dca-table-v1'
+
+# Float columns of the DCA table, in the order they are packed
+DCA_TABLE_COLUMNS = (
+    'deviation_current',
+    'deviation_initial',
+    'total_deviation_current',
+    'total_deviation_initial',
+    'volume',
+    'total_volume'
+)
+
+
+class DCALadder:
+    """
+    DCA table as columns, with the shifts resolved per order when it's accessed.
+
+    The current deviations are stored as they were before the shifts (the base), and every
+    shift point is (start from order, shift percentage, only total). A shift changes the
+    deviation of the start order (unless only the total is shifted) and the total deviation
+    of the start order and all orders after it. The shifts are indexed as cumulative offsets
+    per start order (prefix sums); the current total deviation of an order is its base plus
+    the offset of the last start order not after it, found by bisection.
+    """
+
+    def __init__(self, orders, deviation_current, deviation_initial, total_deviation_current,
+                 total_deviation_initial, volume, total_volume, shifts=None):
+        """
+        :param orders: Order numbers (ascending)
+        :param deviation_current: Deviation per order, before the shifts
+        :param deviation_initial: Initial deviation per order
+        :param total_deviation_current: Total deviation per order, before the shifts
+        :param total_deviation_initial: Initial total deviation per order
+        :param volume: Volume per order
+        :param total_volume: Total volume including the order
+        :param shifts: Shift points as (start from order, shift percentage, only total)
+        """
+
+        self.orders = [int(order) for order in orders]
+        self.deviation_base = [float(value) for value in deviation_current]
+        self.deviation_initial = [float(value) for value in deviation_initial]
+        self.total_deviation_base = [float(value) for value in total_deviation_current]
+        self.total_deviation_initial = [float(value) for value in total_deviation_initial]
+        self.volume = [float(value) for value in volume]
+        self.total_volume = [float(value) for value in total_volume]
+        self.shifts = [(int(order), float(shift), bool(only_total)) for order, shift, only_total in (shifts or [])]
+
+        self._index_shifts()
+
+
+    @classmethod
+    def from_table(cls, table: list) -> 'DCALadder':
+        """
+        Create a ladder from a DCA table as list of dicts.
+
+        :param table: DCA table as list of dicts
+        :return DCALadder: The ladder
+        """
+
+        return cls(
+            [order['order'] for order in table],
+            *([order[column] for order in table] for column in DCA_TABLE_COLUMNS)
+        )
+
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._order(idx) for idx in range(len(self.orders))[index]]
+
+        return self._order(range(len(self.orders))[index])
+
+
+    def __iter__(self):
+        return (self._order(idx) for idx in range(len(self.orders)))
+
+
+    def __repr__(self) -> str:
+        return repr(self.table())
+
+
+    def shift(self, start_from_order: int, shift_percentage: float, only_total: bool = False) -> None:
+        """
+        Shift the ladder from a certain order. Registers the shift point, and adds the shift
+        to the cumulative offsets of the start order and the start orders after it.
+
+        :param start_from_order: Order number to start shifting from
+        :param shift_percentage: Percentage to shift
+        :param only_total: Only shift the total deviation, not the deviation of the start order
+        """
+
+        shift = (int(start_from_order), float(shift_percentage), bool(only_total))
+
+        self.shifts.append(shift)
+        self._add_offset(*shift)
+
+
+    def deviation_current(self, index: int) -> float:
+        """
+        Current deviation of the order at the index, with all shifts applied.
+
+        :param index: Index of the order
+        :return float: The deviation
+        """
+
+        offset = self._deviation_offsets.get(self.orders[index])
+        if offset is None:
+            return self.deviation_base[index]
+
+        return self.deviation_base[index] + offset
+
+
+    def total_deviation_current(self, index: int) -> float:
+        """
+        Current total deviation of the order at the index, with all shifts applied.
+
+        :param index: Index of the order
+        :return float: The total deviation
+        """
+
+        point = bisect_right(self._points, self.orders[index])
+        if point == 0:
+            return self.total_deviation_base[index]
+
+        return self.total_deviation_base[index] + self._offsets[point - 1]
+
+
+    def count_crossed(self, start: int, price_deviation: float) -> int:
+        """
+        Count the consecutive orders, starting at index `start`, of which the total deviation
+        has been reached by the price deviation. The total deviations are descending, so the
+        orders are found by bisection; when shifts made them non-descending, by a linear scan.
+
+        :param start: Index of the first order to check
+        :param price_deviation: Current price deviation (percentage, negative when below entry)
+        :return int: Number of reached orders
+        """
+
+        if self._descending is None:
+            self._descending = self._is_descending()
+
+        if self._descending:
+            return bisect_right(range(len(self.orders)), -price_deviation, lo=start,
+                                key=lambda idx: -self.total_deviation_current(idx)) - start
+
+        count = 0
+        for idx in range(start, len(self.orders)):
+            if price_deviation > self.total_deviation_current(idx):
+                break
+            count += 1
+
+        return count
+
+
+    def table(self) -> list:
+        """
+        Get the DCA table as list of dicts, with all shifts applied.
+
+        :return list: list of Safety Orders
+        """
+
+        return [self._order(idx) for idx in range(len(self.orders))]
+
+
+    def extend(self, table: list) -> None:
+        """
+        Append orders to the ladder. The shifts are folded into the base first, so they
+        don't apply to the new orders.
+
+        :param table: Orders to append, as list of dicts
+        """
+
+        self.fold()
+
+        self.orders += [int(order['order']) for order in table]
+        for attribute, column in zip(('deviation_base', 'deviation_initial', 'total_deviation_base',
+                                      'total_deviation_initial', 'volume', 'total_volume'), DCA_TABLE_COLUMNS):
+            getattr(self, attribute).extend(float(order[column]) for order in table)
+
+        self._index_shifts()
+
+
+    def fold(self) -> None:
+        """
+        Apply all shifts to the base deviations, and clear the shift points.
+        """
+
+        self.deviation_base = [self.deviation_current(idx) for idx in range(len(self.orders))]
+        self.total_deviation_base = [self.total_deviation_current(idx) for idx in range(len(self.orders))]
+        self.shifts = []
+
+        self._index_shifts()
+
+
+    def _order(self, index: int) -> dict:
+        """
+        Get one Safety Order as dict, with all shifts applied.
+        """
+
+        return {
+            'order': self.orders[index],
+            'deviation_current': self.deviation_current(index),
+            'deviation_initial': self.deviation_initial[index],
+            'total_deviation_current': self.total_deviation_current(index),
+            'total_deviation_initial': self.total_deviation_initial[index],
+            'volume': self.volume[index],
+            'total_volume': self.total_volume[index]
+        }
+
+
+    def _index_shifts(self) -> None:
+        """
+        Build the cumulative offsets of all shift points again.
+        """
+
+        totals = self.total_deviation_base
+
+        self._points = []
+        self._offsets = []
+        self._deviation_offsets = {}
+        self._base_descending = all(current >= following for current, following in zip(totals, totals[1:]))
+        self._descending = None
+
+        for shift in self.shifts:
+            self._add_offset(*shift)
+
+
+    def _add_offset(self, start_from_order: int, shift_percentage: float, only_total: bool) -> None:
+        """
+        Add a shift to the cumulative offsets; O(number of shift points) instead of O(number of orders).
+        """
+
+        point = bisect_left(self._points, start_from_order)
+        if point == len(self._points) or self._points[point] != start_from_order:
+            self._points.insert(point, start_from_order)
+            self._offsets.insert(point, self._offsets[point - 1] if point > 0 else 0.0)
+
+        for idx in range(point, len(self._offsets)):
+            self._offsets[idx] += shift_percentage
+
+        if not only_total:
+            self._deviation_offsets[start_from_order] = self._deviation_offsets.get(start_from_order, 0.0) + shift_percentage
+
+        self._descending = None
+
+
+    def _is_descending(self) -> bool:
+        """
+        Check if the current total deviations are descending. Between two shift points the
+        offset is the same for all orders, so only the orders around the shift points can
+        differ from the (precalculated) base.
+        """
+
+        if not self._base_descending:
+            return False
+
+        for point in self._points:
+            idx = bisect_left(self.orders, point)
+            if 0 < idx < len(self.orders) and self.total_deviation_current(idx - 1) < self.total_deviation_current(idx):
+                return False
+
+        return True
+
+
+def encode_dca_table(table) -> dict:
+    """
+    Pack a DCA table for storage.
+
+    :param table: DCA table as DCALadder or list of dicts
+    :return dict: Compact representation of the table
+    """
+
+    ladder = table if isinstance(table, DCALadder) else DCALadder.from_table(table)
+
+    values = np.array(
+        [
+            ladder.deviation_base,
+            ladder.deviation_initial,
+            ladder.total_deviation_base,
+            ladder.total_deviation_initial,
+            ladder.volume,
+            ladder.total_volume
+        ],
+        dtype='<f8'
+    ).reshape(len(DCA_TABLE_COLUMNS), len(ladder))
+
+    data = {
+        'format': DCA_TABLE_FORMAT,
+        'orders': list(ladder.orders),
+        'values': base64.b64encode(values.tobytes()).decode('ascii')
+    }
+    if ladder.shifts:
+        data['shifts'] = [list(shift) for shift in ladder.shifts]
+
+    return data
+
+
+def decode_dca_table(data) -> DCALadder:
+    """
+    Unpack a stored DCA table.
+
+    :param data: Compact representation of the table, or a table stored as list of dicts
+    :return DCALadder: The DCA table (None when nothing was stored)
+    """
+
+    if data is None:
+        return None
+
+    if isinstance(data, list):
+        return DCALadder.from_table(data)
+
+    if not isinstance(data, dict) or data.get('format') != DCA_TABLE_FORMAT:
+        raise ValueError(f"Unknown format of stored DCA table: '{data}'")
+
+    orders = data['orders']
+    values = np.frombuffer(base64.b64decode(data['values']), dtype='<f8').reshape(len(DCA_TABLE_COLUMNS), len(orders))
+
+    return DCALadder(orders, *values.tolist(), shifts=data.get('shifts'))
@@ -0,0 +1,172 @@
+import functools
+import os
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+### Latency instrumentation for the (hot path) callbacks of the strategies.
+##  - callbacks are wrapped on the strategy instance; freqtrade calls the wrapper
+##  - per callback and pair the most recent durations are kept (bounded), together
+##    with the total number of calls, total time and the maximum duration
+##  - percentiles (p50/p95/p99) are calculated when a summary is requested, so the
+##    wrapped callbacks only pay for two `perf_counter()` calls and an append
+##  - the summary can be written as Prometheus text file, for the textfile collector
+##    of a local node exporter
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyRecorder:
+    """
+    Durations of callbacks per callback and pair.
+    """
+
+    def __init__(self, max_samples: int = 1024):
+        """
+        :param max_samples: Number of most recent durations kept per callback and pair
+        """
+
+        self.max_samples = max_samples
+
+        # (callback, pair) -> [samples, count, total, max]
+        self._series = {}
+
+
+    def wrap(self, name: str, func):
+        """
+        Wrap a callback to record the duration of every call.
+
+        :param name: Name of the callback, used in the statistics
+        :param func: The (bound) callback to wrap
+        :return: The wrapper
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, _pair_of(args, kwargs), time.perf_counter() - start)
+
+        return wrapper
+
+
+    def record(self, name: str, pair: str, seconds: float) -> None:
+        """
+        Register the duration of a call.
+
+        :param name: Name of the callback
+        :param pair: Pair the callback was called for (None when unknown)
+        :param seconds: Duration of the call in seconds
+        """
+
+        series = self._series.get((name, pair))
+        if series is None:
+            series = [deque(maxlen=self.max_samples), 0, 0.0, 0.0]
+            self._series[(name, pair)] = series
+
+        series[0].append(seconds)
+        series[1] += 1
+        series[2] += seconds
+        if seconds > series[3]:
+            series[3] = seconds
+
+
+    def summary(self, per_pair: bool = False) -> dict:
+        """
+        Get the statistics per callback (and pair).
+
+        :param per_pair: Return the statistics per callback and pair, instead of per callback
+        :return dict: Key (callback, or tuple of callback and pair) to count, total, p50, p95, p99 and max (seconds)
+        """
+
+        grouped = {}
+        for (name, pair), series in self._series.items():
+            key = (name, pair) if per_pair else name
+            grouped.setdefault(key, []).append(series)
+
+        result = {}
+        for key, serieslist in grouped.items():
+            samples = np.fromiter((s for series in serieslist for s in series[0]), dtype=np.float64)
+            percentiles = np.quantile(samples, QUANTILES) if len(samples) else (0.0,) * len(QUANTILES)
+
+            result[key] = {
+                'count': sum(series[1] for series in serieslist),
+                'total': sum(series[2] for series in serieslist),
+                'p50': float(percentiles[0]),
+                'p95': float(percentiles[1]),
+                'p99': float(percentiles[2]),
+                'max': max(series[3] for series in serieslist)
+            }
+
+        return result
+
+
+    def write_prometheus(self, path, prefix: str = 'freqtrade_strategy_callback') -> None:
+        """
+        Write the statistics per callback and pair as Prometheus text file. The file is
+        replaced atomically, as the textfile collector may read it at any moment.
+
+        :param path: Location of the file (should end with '.prom')
+        :param prefix: Prefix of the metric names
+        """
+
+        lines = [
+            f"# HELP {prefix}_latency_seconds Duration of strategy callbacks.",
+            f"# TYPE {prefix}_latency_seconds summary",
+        ]
+        maxlines = [
+            f"# HELP {prefix}_latency_max_seconds Maximum duration of strategy callbacks.",
+            f"# TYPE {prefix}_latency_max_seconds gauge",
+        ]
+
+        for (name, pair), stats in sorted(self.summary(per_pair=True).items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            labels = f'callback="{name}",pair="{_escape(pair or "")}"'
+            for quantile in QUANTILES:
+                lines.append(f'{prefix}_latency_seconds{{{labels},quantile="{quantile}"}} {stats[f"p{round(quantile * 100)}"]:.9f}')
+            lines.append(f"{prefix}_latency_seconds_sum{{{labels}}} {stats['total']:.9f}")
+            lines.append(f"{prefix}_latency_seconds_count{{{labels}}} {stats['count']}")
+            maxlines.append(f"{prefix}_latency_max_seconds{{{labels}}} {stats['max']:.9f}")
+
+        path = Path(path)
+        tmppath = path.with_suffix('.tmp')
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmppath, 'w') as file:
+            file.write("\n".join(lines + maxlines) + "\n")
+        os.replace(tmppath, path)
+
+
+def _pair_of(args: tuple, kwargs: dict):
+    """
+    Find the pair in the arguments of a callback; passed as `pair`, or part of the
+    `metadata` dict (populate_* functions) or the `trade` object.
+    """
+
+    if 'pair' in kwargs:
+        return kwargs['pair']
+    if 'metadata' in kwargs:
+        return kwargs['metadata'].get('pair')
+    if 'trade' in kwargs:
+        return getattr(kwargs['trade'], 'pair', None)
+
+    for arg in args:
+        if isinstance(arg, str):
+            return arg
+        if isinstance(arg, dict) and 'pair' in arg:
+            return arg['pair']
+        if hasattr(arg, 'pair'):
+            return arg.pair
+
+    return None
+
+
+def _escape(value: str) -> str:
+    """
+    Escape a Prometheus label value.
+    """
+
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,60 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+### Non-blocking logging for the strategies. Records of the strategy logger are put on
+##  a queue, and a background thread hands them to the handlers of the root logger (as
+##  configured by freqtrade). Writing to disk never happens on the main bot loop.
+##  The handlers are looked up when a record is processed, so handlers replaced by
+##  freqtrade (for example on a reload of the config) are used automatically.
+##  The message of a record is formatted before it's queued (as `QueueHandler` does), so
+##  it shows the values at the time of logging, and objects passed as arguments are never
+##  accessed from the background thread. The strategies only log enabled levels, so only
+##  records that are written are formatted.
+
+# Listeners per logger name, so a new strategy instance (reload_config) reuses the existing queue
+_listeners = {}
+
+
+class _ForwardHandler(logging.Handler):
+    """
+    Hand records from the queue to the current handlers of the target logger.
+    """
+
+    def __init__(self, target: logging.Logger):
+        super().__init__()
+        self.target = target
+
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.target.handle(record)
+
+
+def enable_queue_logging(logger: logging.Logger) -> QueueListener:
+    """
+    Send the records of the logger through a queue to a background writer, instead of
+    passing them directly to the handlers of the parent loggers. The level of the logger
+    is not changed, so `isEnabledFor` keeps working as before.
+
+    :param logger: Logger to make non-blocking
+    :return QueueListener: The listener processing the queue
+    """
+
+    if logger.name in _listeners:
+        return _listeners[logger.name]
+
+    recordqueue = queue.SimpleQueue()
+
+    listener = QueueListener(recordqueue, _ForwardHandler(logging.getLogger()), respect_handler_level=False)
+    listener.start()
+
+    # Make sure records still in the queue are written on exit
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(recordqueue))
+    logger.propagate = False
+
+    _listeners[logger.name] = listener
+
+    return listener
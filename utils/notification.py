@@ -0,0 +1,171 @@
+import time
+from collections import OrderedDict, deque
+
+### Coalescing and rate limiting of notifications (Telegram and friends) send by the strategies.
+##  - messages are keyed by pair and category; a message for a key that was send within the
+##    debounce window of its category is suppressed
+##  - in digest mode all messages are collected, a newer message for the same key replaces
+##    the older one, and once per interval the collected messages are send as one message
+##  - a hard cap limits the number of messages send per minute
+##  - urgent messages (warnings and errors) are never debounced, collected or capped; they are
+##    send right away, but do count towards the cap for the other messages
+##  - suppressed (dropped) and coalesced messages are counted for logging purposes
+
+
+class NotificationThrottle:
+    """
+    Decide which notifications are send, and when.
+    """
+
+    def __init__(self, debounce_seconds: float = 0.0, category_debounce_seconds: dict = None,
+                 digest_interval_seconds: float = 0.0, max_per_minute: int = 0):
+        """
+        :param debounce_seconds: Minimum time between two messages for the same pair and category
+        :param category_debounce_seconds: Debounce window per category, overriding `debounce_seconds`
+        :param digest_interval_seconds: Interval for sending collected messages; 0 disables digest mode
+        :param max_per_minute: Maximum number of messages send per minute; 0 means unlimited
+        """
+
+        self.debounce_seconds = float(debounce_seconds)
+        self.category_debounce_seconds = dict(category_debounce_seconds or {})
+        self.digest_interval_seconds = float(digest_interval_seconds)
+        self.max_per_minute = int(max_per_minute)
+
+        self._last_sent = {}
+        self._sent_times = deque()
+        self._pending = OrderedDict()
+        self._last_digest = time.monotonic()
+
+        self.sent = 0
+        self.digests = 0
+        self.coalesced = 0
+        self.suppressed_debounce = 0
+        self.suppressed_rate = 0
+
+
+    def submit(self, message: str, pair: str = None, category: str = None, now: float = None,
+               urgent: bool = False) -> list:
+        """
+        Offer a message for sending.
+
+        :param message: Message to send
+        :param pair: Pair the message is about, if any
+        :param category: Category of the message (for example 'trailing')
+        :param now: Current monotonic time; taken from the clock when not given
+        :param urgent: Send the message right away, regardless of debounce, digest and cap
+        :return list: Messages to send right away (empty when suppressed or collected)
+        """
+
+        now = time.monotonic() if now is None else now
+
+        if urgent:
+            self._allow(now, force=True)
+            return [message]
+
+        # Messages not related to a pair are only debounced when the text is the same
+        key = (pair, category) if pair is not None else (None, category, message)
+
+        if self.digest_interval_seconds > 0:
+            if key in self._pending:
+                self.coalesced += 1
+                self._pending.move_to_end(key)
+            self._pending[key] = message
+
+            return self.flush(now)
+
+        debounce = self.category_debounce_seconds.get(category, self.debounce_seconds)
+        last = self._last_sent.get(key)
+        if last is not None and (now - last) < debounce:
+            self.suppressed_debounce += 1
+            return []
+
+        if not self._allow(now):
+            self.suppressed_rate += 1
+            return []
+
+        self._last_sent[key] = now
+
+        return [message]
+
+
+    def flush(self, now: float = None, force: bool = False) -> list:
+        """
+        Send the collected messages as one digest, when the digest interval has passed.
+
+        :param now: Current monotonic time; taken from the clock when not given
+        :param force: Send the digest even when the interval has not passed yet
+        :return list: The digest message, or an empty list when there is nothing to send (yet)
+        """
+
+        if not self._pending:
+            return []
+
+        now = time.monotonic() if now is None else now
+        if not force and (now - self._last_digest) < self.digest_interval_seconds:
+            return []
+
+        # Keep the messages for the next interval when the cap is reached (nothing is dropped)
+        if not self._allow(now):
+            return []
+
+        messages = list(self._pending.values())
+        self._pending.clear()
+        self._last_digest = now
+        self.digests += 1
+
+        if len(messages) == 1:
+            return messages
+
+        return [f"{len(messages)} notifications:\n" + "\n".join(messages)]
+
+
+    def cleanup(self, now: float = None) -> int:
+        """
+        Remove the send times of keys outside their debounce window.
+
+        :param now: Current monotonic time; taken from the clock when not given
+        :return int: Number of removed keys
+        """
+
+        now = time.monotonic() if now is None else now
+
+        maxdebounce = max([self.debounce_seconds, *self.category_debounce_seconds.values()])
+        outdatedkeys = [key for key, last in self._last_sent.items() if (now - last) >= maxdebounce]
+        for key in outdatedkeys:
+            del self._last_sent[key]
+
+        return len(outdatedkeys)
+
+
+    def stats(self) -> dict:
+        """
+        Get the statistics, for logging purposes.
+
+        :return dict: Number of send, coalesced and suppressed messages, digests and pending messages
+        """
+
+        return {
+            'sent': self.sent,
+            'digests': self.digests,
+            'coalesced': self.coalesced,
+            'suppressed_debounce': self.suppressed_debounce,
+            'suppressed_rate': self.suppressed_rate,
+            'pending': len(self._pending)
+        }
+
+
+    def _allow(self, now: float, force: bool = False) -> bool:
+        """
+        Check the cap of messages per minute, and register a send message when allowed (or forced).
+        """
+
+        while self._sent_times and (now - self._sent_times[0]) >= 60.0:
+            self._sent_times.popleft()
+
+        if not force and self.max_per_minute > 0 and len(self._sent_times) >= self.max_per_minute:
+            return False
+
+        self._sent_times.append(now)
+        self.sent += 1
+
+        return True
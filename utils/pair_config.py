@@ -0,0 +1,143 @@
+### Configuration per pair and side (direction), resolved once instead of on every callback.
+##  - the configuration of the strategies is keyed by '<pair>_<side>' strings, with 'default'
+##    as fallback; a resolved configuration holds the composed key and the configuration
+##    that applies to the pair and side, bound directly (so no string formatting and no
+##    membership tests are required afterwards)
+##  - the resolver keeps the configurations keyed by (pair, side) tuples, and creates them with
+##    the factory of the strategy, so strategies can bind their own configuration by subclassing
+##  - configurations are created for the whitelist when it changes, and on first use for other
+##    pairs; the resolver must be cleared when the configuration of the strategy changes
+
+
+class PairConfig:
+    """
+    Configuration of a pair and side.
+    """
+
+    __slots__ = ('pair', 'side', 'pairkey', 'leverage')
+
+    def __init__(self, pair: str, side: str, leverage: float = 1.0):
+        """
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :param leverage: Leverage to use for the pair and side
+        """
+
+        self.pair = pair
+        self.side = side
+        self.pairkey = f"{pair}_{side}"
+        self.leverage = leverage
+
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for klass in reversed(type(self).__mro__)
+                           for name in getattr(klass, '__slots__', ()))
+
+        return f"{self.__class__.__name__}({fields})"
+
+
+class DCAPairConfig(PairConfig):
+    """
+    Configuration of a pair and side for DCA; keys of the Safety Order and profit configuration,
+    the trailing and profit levels, and the DCA table template to use.
+    """
+
+    __slots__ = (
+        'safety_key',           # Key of the Safety Order configuration (pair key or 'default')
+        'profit_key',           # Key of the profit configuration (pair key or 'default')
+        'trailing_levels',      # Levels of the trailing configuration, or None when not configured
+        'profit_levels',        # Levels of the profit configuration, or None when not configured
+        'dca_table_template'    # DCA table for new trades (do not modify), or None when not used yet
+    )
+
+    def __init__(self, pair: str, side: str, leverage: float = 1.0):
+        super().__init__(pair, side, leverage)
+
+        self.safety_key: str = 'default'
+        self.profit_key: str = 'default'
+        self.trailing_levels = None
+        self.profit_levels = None
+        self.dca_table_template = None
+
+
+def resolve_config_key(pairkey: str, configuration: dict) -> str:
+    """
+    Get the key of the configuration applying to a pair key; the pair key itself, or 'default'.
+
+    :param pairkey: The composed pair key ('<pair>_<side>')
+    :param configuration: Configuration keyed by pair key and/or 'default'
+    :return str: The key to use
+    """
+
+    return pairkey if pairkey in configuration else 'default'
+
+
+class PairConfigResolver:
+    """
+    Resolved configurations keyed by (pair, side).
+    """
+
+    def __init__(self, factory=PairConfig, sides: tuple = ('long', 'short')):
+        """
+        :param factory: Function (or class) creating the configuration of a pair and side
+        :param sides: Sides to resolve for the pairs of the whitelist
+        """
+
+        self.factory = factory
+        self.sides = tuple(sides)
+
+        self.whitelist = ()
+
+        self._configs = {}
+
+        self.refreshes = 0
+
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+
+    def get(self, pair: str, side: str):
+        """
+        Get the configuration of a pair and side; resolved on first use when not present yet.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :return: The configuration
+        """
+
+        config = self._configs.get((pair, side))
+        if config is None:
+            config = self.factory(pair, side)
+            self._configs[(pair, side)] = config
+
+        return config
+
+
+    def refresh(self, whitelist) -> bool:
+        """
+        Resolve the configurations of the whitelist again, when the whitelist has changed.
+
+        :param whitelist: Pairs currently in the whitelist
+        :return bool: True if the whitelist had changed
+        """
+
+        whitelist = tuple(whitelist)
+        if whitelist == self.whitelist:
+            return False
+
+        self.whitelist = whitelist
+        self._configs = {(pair, side): self.factory(pair, side) for pair in whitelist for side in self.sides}
+        self.refreshes += 1
+
+        return True
+
+
+    def clear(self) -> None:
+        """
+        Remove all configurations, for example after the configuration of the strategy has changed.
+        The whitelist is resolved again on the next refresh.
+        """
+
+        self.whitelist = ()
+        self._configs = {}
@@ -0,0 +1,184 @@
+from datetime import datetime
+
+### Runtime state per pair and side (direction) of the strategies.
+##  - every state is an object with `__slots__`, so fields are accessed as attributes, use
+##    little memory, and assigning an unknown field raises an error instead of silently
+##    adding a new key
+##  - the registry keeps the states keyed by (pair, side) tuples, and creates them with the
+##    factory of the strategy, so strategies can add their own fields by subclassing
+
+
+class PairState:
+    """
+    Runtime state of a pair and side.
+    """
+
+    __slots__ = ('pair', 'side')
+
+    def __init__(self, pair: str, side: str):
+        """
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        """
+
+        self.pair = pair
+        self.side = side
+
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields())
+
+        return f"{self.__class__.__name__}({fields})"
+
+
+    def as_dict(self) -> dict:
+        """
+        Get all fields, for logging and storage purposes.
+
+        :return dict: Field name to value
+        """
+
+        return {name: getattr(self, name) for name in self._fields()}
+
+
+    def reset(self) -> None:
+        """
+        Reset the fields to their initial values, for a new trade on the pair and side.
+        """
+
+
+    def restore(self, fields: dict) -> None:
+        """
+        Set the fields from a stored state (see `as_dict`). Unknown fields, and the pair
+        and side, are ignored.
+
+        :param fields: Field name to value
+        """
+
+        for name in self._fields():
+            if name in fields and name not in ('pair', 'side'):
+                setattr(self, name, fields[name])
+
+
+    @classmethod
+    def _fields(cls) -> list:
+        """
+        Names of the fields of this class and its base classes.
+        """
+
+        return [name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ())]
+
+
+class DCAPairState(PairState):
+    """
+    Runtime state of a pair and side for DCA; trailing and Safety Orders to buy.
+    """
+
+    __slots__ = (
+        'last_profit_percentage',                   # Keep track of profit percentage for every cycle/update
+        'next_safety_order_profit_percentage',      # Percentage on which the next SO is configured
+        'add_safety_order_on_profit_percentage',    # Percentage on which the next SO should be bought, based on trailing
+        'trailing_start_datetime',                  # Datetime trailing started
+        'open_safety_orders'                        # List of open Safety Orders to buy
+    )
+
+    def __init__(self, pair: str, side: str):
+        super().__init__(pair, side)
+
+        self.last_profit_percentage: float = 0.0
+        self.next_safety_order_profit_percentage: float = 0.0
+        self.add_safety_order_on_profit_percentage: float = 0.0
+        self.trailing_start_datetime: datetime = datetime.min
+        self.open_safety_orders: list = list()
+
+
+    def reset(self) -> None:
+        super().reset()
+
+        self.reset_trailing()
+        self.next_safety_order_profit_percentage = 0.0
+        self.open_safety_orders = list()
+
+
+    def reset_trailing(self) -> None:
+        """
+        Reset the trailing progress.
+        """
+
+        self.last_profit_percentage = 0.0
+        self.add_safety_order_on_profit_percentage = 0.0
+        self.trailing_start_datetime = datetime.min
+
+
+class PairStateRegistry:
+    """
+    Runtime states keyed by (pair, side).
+    """
+
+    def __init__(self, factory=PairState):
+        """
+        :param factory: Function (or class) creating a new state for a pair and side
+        """
+
+        self.factory = factory
+
+        self._states = {}
+
+
+    def __contains__(self, key) -> bool:
+        return key in self._states
+
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+    def __iter__(self):
+        return iter(self._states.values())
+
+
+    def get(self, pair: str, side: str):
+        """
+        Get the state of a pair and side.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :return: The state, or None when not present
+        """
+
+        return self._states.get((pair, side))
+
+
+    def create(self, pair: str, side: str):
+        """
+        Create a new (initial) state for a pair and side, replacing any existing state.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :return: The new state
+        """
+
+        state = self.factory(pair, side)
+        self._states[(pair, side)] = state
+
+        return state
+
+
+    def remove(self, pair: str, side: str) -> bool:
+        """
+        Remove the state of a pair and side.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :return bool: True if the state was present
+        """
+
+        return self._states.pop((pair, side), None) is not None
+
+
+    def clear(self) -> None:
+        """
+        Remove all states.
+        """
+
+        self._states.clear()
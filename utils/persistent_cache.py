@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from pandas import DataFrame, RangeIndex, read_feather
+
+### Persistent storage of cached dataframes (with calculated indicators), to avoid
+##  calculating everything from scratch after a restart or `reload_config`.
+##  - dataframes are stored as Feather (Arrow) files under the user data directory,
+##    one file per pair and timeframe, in a directory per strategy
+##  - file names contain a hash of the indicator parameters of the strategy, so files
+##    written with other parameters are never used (and removed on start)
+##  - files are only read when the dataframe is requested for the first time
+
+
+class PersistentDataFrameCache:
+    """
+    Feather files with dataframes per pair and timeframe, for warm restarts.
+    """
+
+    def __init__(self, directory, strategy_name: str, parameters: dict):
+        """
+        :param directory: Base directory, usually '<user_data_dir>/indicator_cache'
+        :param strategy_name: Name of the strategy, used as sub directory
+        :param parameters: Indicator parameters of the strategy; part of the file names
+        """
+
+        self.directory = Path(directory) / strategy_name
+        self.parameters_hash = hashlib.sha1(
+            json.dumps(parameters, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:12]
+
+        # Keys tried to load already, and keys updated since the last flush
+        self._loaded = set()
+        self._dirty = {}
+
+        self.loads = 0
+        self.stores = 0
+        self.errors = 0
+
+
+    def path(self, pair: str, tf: str) -> Path:
+        """
+        Get the file for a pair and timeframe.
+
+        :param pair: Pair of the dataframe
+        :param tf: Timeframe of the dataframe
+        :return Path: Location of the Feather file
+        """
+
+        name = pair.replace('/', '_').replace(':', '_')
+
+        return self.directory / f"{name}-{tf}-{self.parameters_hash}.feather"
+
+
+    def remove_outdated(self) -> list:
+        """
+        Remove files written with other indicator parameters.
+
+        :return list: Names of the removed files
+        """
+
+        removed = []
+        if not self.directory.is_dir():
+            return removed
+
+        for file in self.directory.glob("*.feather"):
+            if not file.stem.endswith(f"-{self.parameters_hash}"):
+                file.unlink(missing_ok=True)
+                removed.append(file.name)
+
+        return removed
+
+
+    def load(self, pair: str, tf: str):
+        """
+        Load the stored dataframe for a pair and timeframe. Only the first call per pair
+        and timeframe reads the disk; the caller is expected to keep it in memory.
+
+        :param pair: Pair of the dataframe
+        :param tf: Timeframe of the dataframe
+        :return DataFrame: Stored dataframe, or None when not present (or already loaded)
+        """
+
+        key = (pair, tf)
+        if key in self._loaded:
+            return None
+
+        self._loaded.add(key)
+
+        path = self.path(pair, tf)
+        if not path.is_file():
+            return None
+
+        try:
+            df = read_feather(path)
+        except (OSError, ValueError, ImportError):
+            self.errors += 1
+            return None
+
+        self.loads += 1
+
+        return df
+
+
+    def mark_dirty(self, pair: str, tf: str, key) -> None:
+        """
+        Register a dataframe that changed and must be written on the next flush.
+
+        :param pair: Pair of the dataframe
+        :param tf: Timeframe of the dataframe
+        :param key: Key of the dataframe in the memory cache
+        """
+
+        self._loaded.add((pair, tf))
+        self._dirty[key] = (pair, tf)
+
+
+    def flush(self, get_dataframe) -> int:
+        """
+        Write all changed dataframes to disk.
+
+        :param get_dataframe: Function returning the current dataframe for a memory cache key (or None)
+        :return int: Number of written files
+        """
+
+        written = 0
+
+        dirty, self._dirty = self._dirty, {}
+        for key, (pair, tf) in dirty.items():
+            df = get_dataframe(key)
+            if df is not None and self.store(pair, tf, df):
+                written += 1
+
+        return written
+
+
+    def store(self, pair: str, tf: str, df: DataFrame) -> bool:
+        """
+        Write a dataframe to disk. The file is replaced atomically.
+
+        :param pair: Pair of the dataframe
+        :param tf: Timeframe of the dataframe
+        :param df: Dataframe to store
+        :return bool: True when written
+        """
+
+        path = self.path(pair, tf)
+        tmppath = path.with_suffix('.tmp')
+
+        if not isinstance(df.index, RangeIndex):
+            df = df.reset_index(drop=True)
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            df.to_feather(tmppath)
+            os.replace(tmppath, path)
+        except (OSError, ValueError, ImportError):
+            self.errors += 1
+            return False
+
+        self.stores += 1
+
+        return True
+
+
+    def stats(self) -> dict:
+        """
+        Get the statistics, for logging purposes.
+
+        :return dict: Number of loads, stores, errors and pending writes
+        """
+
+        return {
+            'loads': self.loads,
+            'stores': self.stores,
+            'errors': self.errors,
+            'pending': len(self._dirty)
+        }
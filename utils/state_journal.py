@@ -0,0 +1,223 @@
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+### Append-only journal of the run-time state per pair and side, to resume after a restart.
+##  - every state transition is appended as one JSON line with the full (small) state of
+##    the pair and side, or a removal marker when the trade has been closed
+##  - lines are buffered in memory, and written and synced to disk (fsync) together by `sync`,
+##    called once per bot loop and at most once per sync interval; the callbacks recording the
+##    transitions never wait for the disk, and a burst of transitions costs one fsync
+##  - replaying reads the journal from start to end; the last line of a key wins. A torn
+##    last line (crash while writing) is skipped
+##  - the journal is compacted to one line per key (atomically replaced) after a number of
+##    appended lines, so replaying stays proportional to the number of open trades
+
+
+class StateJournal:
+    """
+    Journal file with the state per (pair, side).
+    """
+
+    def __init__(self, path, sync_interval: float = 1.0, compact_after: int = 1000):
+        """
+        :param path: Location of the journal file
+        :param sync_interval: Minimum time in seconds between two syncs to disk
+        :param compact_after: Number of appended lines after which compaction is required
+        """
+
+        self.path = Path(path)
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+
+        self._file = None
+        self._pending = []
+        self._last_sync = time.monotonic()
+        self._appended = 0
+
+        self.records = 0
+        self.syncs = 0
+        self.compactions = 0
+        self.errors = 0
+
+
+    def record(self, pair: str, side: str, state: dict) -> None:
+        """
+        Append the state of a pair and side.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        :param state: Fields of the state; must be JSON serializable (datetimes are supported)
+        """
+
+        self._append({'pair': pair, 'side': side, 'state': state})
+
+
+    def remove(self, pair: str, side: str) -> None:
+        """
+        Append the removal of the state of a pair and side.
+
+        :param pair: Trading pair
+        :param side: Direction of the trade (long/short)
+        """
+
+        self._append({'pair': pair, 'side': side, 'removed': True})
+
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        Write the buffered lines and sync them to disk, when the sync interval has passed.
+
+        :param force: Sync even when the interval has not passed yet
+        :return bool: True if synced
+        """
+
+        if not self._pending:
+            return False
+
+        now = time.monotonic()
+        if not force and (now - self._last_sync) < self.sync_interval:
+            return False
+
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+        self._file.write(''.join(self._pending))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._pending.clear()
+        self._last_sync = now
+        self.syncs += 1
+
+        return True
+
+
+    def replay(self) -> dict:
+        """
+        Read the journal.
+
+        :return dict: (pair, side) to the last recorded state, for keys not removed
+        """
+
+        states = {}
+        if not self.path.is_file():
+            return states
+
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line, object_hook=_decode)
+                    key = (entry['pair'], entry['side'])
+                except (ValueError, KeyError, TypeError):
+                    self.errors += 1
+                    continue
+
+                if entry.get('removed'):
+                    states.pop(key, None)
+                else:
+                    states[key] = entry.get('state', {})
+
+        return states
+
+
+    def needs_compaction(self) -> bool:
+        """
+        Check if enough lines have been appended to compact the journal.
+        """
+
+        return self._appended >= self.compact_after
+
+
+    def compact(self, states: dict) -> None:
+        """
+        Replace the journal by one line per key. The new journal is synced before it
+        replaces the current one, so a crash leaves either of them intact.
+
+        :param states: (pair, side) to the current state
+        """
+
+        self.close()
+
+        tmppath = self.path.with_suffix('.tmp')
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmppath, 'w', encoding='utf-8') as file:
+            for (pair, side), state in states.items():
+                file.write(_encode({'pair': pair, 'side': side, 'state': state}))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmppath, self.path)
+
+        self._appended = 0
+        self.compactions += 1
+
+
+    def close(self) -> None:
+        """
+        Sync the buffered lines and close the journal file. It is opened again on the next sync.
+        """
+
+        self.sync(force=True)
+
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+
+
+    def stats(self) -> dict:
+        """
+        Get the statistics, for logging purposes.
+
+        :return dict: Number of records, syncs, compactions, errors, lines appended since the last compaction
+                      and lines not synced yet
+        """
+
+        return {
+            'records': self.records,
+            'syncs': self.syncs,
+            'compactions': self.compactions,
+            'errors': self.errors,
+            'appended': self._appended,
+            'pending': len(self._pending)
+        }
+
+
+    def _append(self, entry: dict) -> None:
+        """
+        Buffer one line; it's written on the next sync.
+        """
+
+        self._pending.append(_encode(entry))
+
+        self._appended += 1
+        self.records += 1
+
+
+def _encode(entry: dict) -> str:
+    """
+    Encode an entry as one line; datetimes are stored as ISO strings.
+    """
+
+    def default(value):
+        if isinstance(value, datetime):
+            return {'__datetime__': value.isoformat()}
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    return json.dumps(entry, default=default, separators=(',', ':')) + "\n"
+
+
+def _decode(value: dict):
+    """
+    Decode the datetimes of an entry.
+    """
+
+    if '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+
+    return value
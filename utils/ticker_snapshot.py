@@ -0,0 +1,123 @@
+import time
+
+### Snapshot of tickers shared by all callers within a short period (usually one bot loop).
+##  - all required tickers are fetched together, once for all callers, instead of by every
+##    caller separately
+##  - the snapshot is reused until its time to live has passed; pairs missing from the
+##    snapshot trigger a new fetch
+##  - when fetching fails (exchange outage) the error is reported and the previous snapshot
+##    is kept, so callers continue with the tickers available
+##  - hits, misses and fetches are counted, and the age of the snapshot is reported, for
+##    logging purposes
+
+
+class TickerSnapshot:
+    """
+    Tickers fetched together for all callers, with a time to live.
+    """
+
+    def __init__(self, fetch_tickers, ttl: float = 5.0, on_error=None):
+        """
+        :param fetch_tickers: Function returning a dict with the ticker per pair, for a list of pairs
+        :param ttl: Time to live of the snapshot in seconds
+        :param on_error: Function called with the exception when fetching fails (for logging)
+        """
+
+        self.fetch_tickers = fetch_tickers
+        self.ttl = ttl
+        self.on_error = on_error
+
+        self._tickers = {}
+        self._fetched = None
+
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.errors = 0
+
+
+    @property
+    def age(self):
+        """
+        Age of the snapshot in seconds, or None when nothing was fetched yet.
+        """
+
+        if self._fetched is None:
+            return None
+
+        return time.monotonic() - self._fetched
+
+
+    def get(self, pairs) -> dict:
+        """
+        Get the tickers of the pairs. When the snapshot is expired, or doesn't contain all
+        pairs, the tickers are fetched again.
+
+        :param pairs: Pairs to get the ticker for
+        :return dict: Ticker per pair; pairs for which no ticker is available are left out
+        """
+
+        pairs = list(dict.fromkeys(pairs))
+
+        age = self.age
+        if age is not None and age < self.ttl and all(pair in self._tickers for pair in pairs):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.refresh(pairs)
+
+        return {pair: self._tickers[pair] for pair in pairs if pair in self._tickers}
+
+
+    def refresh(self, pairs) -> bool:
+        """
+        Fetch the tickers of the pairs and start a new snapshot. The previous snapshot is
+        kept when fetching fails.
+
+        :param pairs: Pairs to fetch the ticker for
+        :return bool: True if the tickers were fetched
+        """
+
+        try:
+            tickers = self.fetch_tickers(list(pairs))
+        except Exception as exception:
+            self.errors += 1
+            if self.on_error is not None:
+                self.on_error(exception)
+            return False
+
+        self._tickers = {pair: ticker for pair, ticker in tickers.items() if ticker}
+        self._fetched = time.monotonic()
+        self.fetches += 1
+
+        return True
+
+
+    def clear(self) -> None:
+        """
+        Drop the snapshot, so the next call fetches the tickers again.
+        """
+
+        self._tickers = {}
+        self._fetched = None
+
+
+    def stats(self) -> dict:
+        """
+        Get the statistics, for logging purposes.
+
+        :return dict: Number of hits, misses, fetches, errors, hit ratio, age (seconds) and number of pairs
+        """
+
+        lookups = self.hits + self.misses
+        age = self.age
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'fetches': self.fetches,
+            'errors': self.errors,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'age': round(age, 2) if age is not None else None,
+            'pairs': len(self._tickers)
+        }